@@ -0,0 +1,218 @@
+"""
+Headless benchmark of the gameplay loop.
+
+Generates charts of increasing density and branch depth, plays each one
+through update_game/draw_game with a scripted MIDI input that hits every
+note of one path down the branch tree, and reports frames per second plus
+memory. The game runs on SDL's dummy drivers, so no display, sound card or
+MIDI device is needed. Each frame simulates 1/FRAME_RATE s of play, so the
+work per frame matches the real game however fast the frames run.
+
+Run from the repository root:
+    python -m benchmarks.game_loop [--notes 16 64 256] [--depths 2 4 8]
+
+Charts are generated with depth sections chained one after another, so
+deeper charts are also longer songs.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from itertools import product
+from pathlib import Path
+import numpy as np
+from mido import Message, MidiFile, MidiTrack
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from game.chart_cache import MIDIBEATLENGTH
+from game.game import Game, GameState
+from game.midi_input import NOTE_OFF, NOTE_ON, MidiEvent, ScriptedInput
+from game.note_data import Branch
+from game.song_tree import load_song_tree
+from game.settings import BPM, FRAME_RATE, MUSIC_FILE
+
+REPO = Path(__file__).resolve().parent.parent
+BRANCH_BEATS = 16  # Length of every generated branch
+TRACKS = 4  # Tracks per generated MIDI file, branch id picks one
+FRAME_MS = 1000 / FRAME_RATE
+
+
+class VirtualClock:
+    """
+    Millisecond clock that only moves when told to, shared by the game and
+    the scripted input so input lands on the same frames on every run.
+    """
+
+    def __init__(self) -> None:
+        self.ms = 0.0
+
+    def __call__(self) -> int:
+        return int(self.ms)
+
+
+def make_workspace() -> Path:
+    """
+    Temporary copy of the assets the game loads by relative path, which the
+    generated charts are written next to.
+    """
+    workspace = Path(tempfile.mkdtemp(prefix="melodify-bench-"))
+    for folder in ("json", "midi"):
+        shutil.copytree(REPO / "branches" / folder, workspace / "branches" / folder)
+    shutil.copytree(
+        REPO / "songs", workspace / "songs", ignore=shutil.ignore_patterns(".cache")
+    )
+    (workspace / MUSIC_FILE).parent.mkdir(parents=True)
+    shutil.copy(REPO / MUSIC_FILE, workspace / MUSIC_FILE)
+    return workspace
+
+
+def write_chart(branches: Path, prefix: str, notes: int, depth: int) -> str:
+    """
+    Write a chain of depth sections, each a MIDI file of TRACKS tracks with
+    notes evenly spaced notes over BRANCH_BEATS beats. Tracks are offset in
+    tone so sibling branches never share a press. Returns the first name.
+    """
+    spacing = BRANCH_BEATS * MIDIBEATLENGTH // notes
+    length = max(1, spacing // 2)
+    for level in range(depth):
+        name = f"{prefix}{level}"
+        midi = MidiFile(ticks_per_beat=MIDIBEATLENGTH)
+        for track_index in range(TRACKS):
+            track = MidiTrack()
+            # Notes start one beat in, a note at tick 0 is read as a held note
+            gap = MIDIBEATLENGTH
+            for index in range(notes):
+                pitch = 60 + (index * 5 + track_index * 3) % 12
+                track.append(Message("note_on", note=pitch, velocity=100, time=gap))
+                track.append(Message("note_off", note=pitch, velocity=0, time=length))
+                gap = spacing - length
+            midi.tracks.append(track)
+        midi.save(branches / "midi" / f"{name}.mid")
+        next_branch = f"{prefix}{level + 1}" if level + 1 < depth else None
+        with open(branches / "json" / f"{name}.json", "w") as out:
+            json.dump({"next_branch": next_branch}, out)
+    return f"{prefix}0"
+
+
+def autoplay(song: str) -> list[MidiEvent]:
+    """
+    Key presses hitting every note on the path through the first child of
+    each branch, stamped in ms of song time.
+    """
+    events = []
+    tree = load_song_tree(song)
+    node = tree.root
+    while True:
+        for note in Branch(*node.key).notes:
+            on = round(note.time * 60000 / BPM)
+            off = on + max(1, round(note.duration * 60000 / BPM / 2))
+            pitch = 60 + note.tone.value
+            events.append(MidiEvent(NOTE_ON, pitch, 100, on))
+            events.append(MidiEvent(NOTE_OFF, pitch, 0, off))
+        if not node.children:
+            return events
+        node = tree.nodes[node.children[0]]
+
+
+def play(game: Game, clock: VirtualClock, song: str, max_frames: int) -> list[float]:
+    """
+    Play song from the start until it ends or max_frames have been drawn.
+    Returns the wall time (ms) of each frame.
+    """
+    clock.ms = 0.0
+    script = autoplay(song)
+    game.midiInput.events.clear()
+    game.midiInput.events.extend(sorted(script, key=lambda event: event.timestamp))
+    game.reset_game_for_song(song)
+    game.midiReader.drain()
+    game.state = GameState.PLAYING
+    frame_times = []
+    for _ in range(max_frames):
+        if game.state != GameState.PLAYING:
+            break
+        start = time.perf_counter()
+        clock.ms += FRAME_MS
+        game.update_pressed_keys()
+        game.update_game(FRAME_MS)
+        game.draw_game()
+        frame_times.append((time.perf_counter() - start) * 1000)
+    return frame_times
+
+
+def max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    # Linux reports kilobytes, macOS bytes
+    scale = 1 if os.uname().sysname == "Darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--notes", type=int, nargs="+", default=[16, 64, 256, 1024])
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        default=FRAME_RATE * 60,
+        help="Stop each run after this many frames (default: a minute of play)",
+    )
+    parser.add_argument(
+        "--memory-frames",
+        type=int,
+        default=FRAME_RATE * 5,
+        help="Frames played again under tracemalloc for the memory figures",
+    )
+    args = parser.parse_args()
+
+    workspace = make_workspace()
+    os.chdir(workspace)
+    clock = VirtualClock()
+    game = Game(headless=True, midi_input=ScriptedInput((), clock), midi_clock=clock)
+    try:
+        print(
+            f"{'notes/branch':>12}{'depth':>7}{'frames':>8}{'hits':>7}"
+            f"{'FPS':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'load MB':>10}{'peak MB':>9}"
+        )
+        for notes, depth in product(args.notes, args.depths):
+            song = write_chart(
+                workspace / "branches", f"n{notes}d{depth}-", notes, depth
+            )
+            play(game, clock, song, 1)  # Compile the charts outside the timed run
+            frame_ms = np.array(play(game, clock, song, args.max_frames))
+            hits = len(game.hit_offsets)
+
+            tracemalloc.start()
+            game.reset_game_for_song(song)
+            load_mb = tracemalloc.get_traced_memory()[0] / 2**20
+            play(game, clock, song, args.memory_frames)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+            p50, p95, p99 = np.percentile(frame_ms, (50, 95, 99))
+            print(
+                f"{notes:12}{depth:7}{len(frame_ms):8}{hits:7}"
+                f"{1000 / frame_ms.mean():9.0f}{p50:9.3f}{p95:9.3f}{p99:9.3f}"
+                f"{load_mb:10.2f}{peak_mb:9.2f}"
+            )
+        rss = max_rss_mb()
+        if rss is not None:
+            print(f"\nMax RSS: {rss:.1f} MB")
+    finally:
+        game.prefetcher.close()
+        os.chdir(REPO)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
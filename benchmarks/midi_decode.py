@@ -0,0 +1,134 @@
+"""
+Cold MIDI chart decoding.
+
+Times compiling one track of each chart in branches/midi, plus a generated
+chart of many long tracks, with the track-selective reader the game uses
+against parsing the whole file with mido as it used to. The two must give
+identical notes. Neither path touches the chart cache, so this is the cost
+a chart pays the first time it is loaded.
+
+Run from the repository root:
+    python -m benchmarks.midi_decode [--runs N] [--tracks 16] [--notes 2000]
+"""
+
+from __future__ import annotations
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from mido import Message, MidiFile, MidiTrack, MetaMessage
+
+from game.chart_cache import (
+    MIDIBEATLENGTH,
+    ChartTable,
+    read_track,
+    read_track_count,
+)
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def mido_track(path: Path, index: int) -> ChartTable:
+    """
+    The previous decoding path: mido parses every track of the file into
+    message objects, then the notes of one are paired up.
+    """
+    track = MidiFile(path).tracks[index]
+    table = ChartTable.empty()
+    on_off: dict[int, int | None] = {tone: 0 for tone in range(12)}
+    current_time = 0
+    for message in track:
+        if not isinstance(message, Message):
+            continue
+        current_time += int(message.time)
+        if message.type not in ("note_on", "note_off"):
+            continue
+        current_tone = message.note % 12
+        if message.type == "note_on":
+            if not on_off[current_tone]:
+                on_off[current_tone] = current_time
+        elif start_time := on_off[current_tone]:
+            table.time.append(start_time / MIDIBEATLENGTH)
+            table.duration.append((current_time - start_time) / MIDIBEATLENGTH)
+            table.tone.append(current_tone)
+            on_off[current_tone] = None
+        else:
+            table.time.append(0)
+            table.duration.append(current_time / MIDIBEATLENGTH)
+            table.tone.append(current_tone)
+    return table
+
+
+def write_large_chart(path: Path, tracks: int, notes: int) -> None:
+    """
+    A chart of tracks tracks of notes notes each, with a controller change
+    and a tempo change in between notes like an exported arrangement has.
+    """
+    midi = MidiFile(ticks_per_beat=MIDIBEATLENGTH)
+    for track_index in range(tracks):
+        track = MidiTrack()
+        track.append(MetaMessage("track_name", name=f"Track {track_index}"))
+        for index in range(notes):
+            pitch = 48 + (index * 7 + track_index) % 24
+            track.append(Message("control_change", control=7, value=index % 128))
+            if index % 16 == 0:
+                track.append(MetaMessage("set_tempo", tempo=500000, time=0))
+            track.append(Message("note_on", note=pitch, velocity=90, time=120))
+            track.append(Message("note_off", note=pitch, velocity=0, time=120))
+        midi.tracks.append(track)
+    midi.save(path)
+
+
+def median_ms(decode, path: Path, index: int, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        decode(path, index)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--tracks", type=int, default=16, help="Tracks in the generated chart"
+    )
+    parser.add_argument(
+        "--notes", type=int, default=2000, help="Notes per generated track"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="melodify-midi-") as folder:
+        large = Path(folder) / "large.mid"
+        write_large_chart(large, args.tracks, args.notes)
+        charts = sorted((REPO / "branches" / "midi").glob("*.mid")) + [large]
+
+        print(
+            f"{'chart':12}{'tracks':>7}{'KB':>8}{'notes':>7}"
+            f"{'mido ms':>10}{'reader ms':>11}{'speedup':>9}"
+        )
+        for path in charts:
+            # The game loads track (branch id % track count), the last is
+            # the furthest into the file
+            index = read_track_count(path) - 1
+            table = read_track(path, index)
+            expected = mido_track(path, index)
+            # Compiled tables are sorted by start time, mido's by end time
+            if list(zip(table.time, table.duration, table.tone)) != sorted(
+                zip(expected.time, expected.duration, expected.tone),
+                key=lambda note: note[0],
+            ):
+                raise AssertionError(f"{path.name} track {index} decoded differently")
+
+            old = median_ms(mido_track, path, index, args.runs)
+            new = median_ms(read_track, path, index, args.runs)
+            print(
+                f"{path.name:12}{index + 1:7}{path.stat().st_size / 1024:8.1f}"
+                f"{len(table):7}{old:10.3f}{new:11.3f}{old / new:8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Time to first frame.
+
+Starts the game headless in a fresh interpreter several times and reports
+how long it takes to import the game, construct Game, and get the home
+screen on the display. Every run is a new process, so module imports and
+pygame's start-up are paid each time as they are by a player.
+
+Run from the repository root:
+    python -m benchmarks.startup [--runs N]
+"""
+
+from time import perf_counter
+
+STARTED = perf_counter()  # Before any other import, timed as part of startup
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def child() -> None:
+    """
+    One startup, measured from the interpreter reaching this module. Prints
+    the timings (ms) as JSON.
+    """
+    from game.game import Game
+
+    imported = perf_counter()
+    game = Game(headless=True)
+    constructed = perf_counter()
+    game.run(frames=1)
+    timings = {
+        "import": imported - STARTED,
+        "Game()": constructed - imported,
+        "first frame": game.first_frame_time - constructed,
+        "total": game.first_frame_time - STARTED,
+    }
+    print(json.dumps({name: seconds * 1000 for name, seconds in timings.items()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            cwd=REPO,
+            env=os.environ | {"PYGAME_HIDE_SUPPORT_PROMPT": "1"},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+
+    print(f"{'':14}{'median ms':>10}{'min ms':>10}{'max ms':>10}")
+    for name in runs[0]:
+        times = [run[name] for run in runs]
+        print(
+            f"{name:14}{statistics.median(times):10.1f}"
+            f"{min(times):10.1f}{max(times):10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
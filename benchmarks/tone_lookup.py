@@ -0,0 +1,172 @@
+"""
+Microbenchmark for the Tone lookup tables.
+
+Times the Tone helpers against the previous implementations, which built a
+new dict (or did a linear name search) on every call, and estimates the
+saving for one frame's worth of lookups.
+
+Run from the repository root:
+    python -m benchmarks.tone_lookup [--frame-lookups N]
+"""
+
+from __future__ import annotations
+import argparse
+import timeit
+import warnings
+from warnings import deprecated
+from pygame import constants
+
+from game.note_data import Tone
+from game.settings import WIDTH_SCALE
+
+
+# The implementations the tables replaced, kept here for comparison
+def legacy_freq(tone: Tone) -> float:
+    return {
+        Tone.C: 130.81,
+        Tone.CS: 138.59,
+        Tone.D: 146.83,
+        Tone.DS: 155.56,
+        Tone.E: 164.81,
+        Tone.F: 174.61,
+        Tone.FS: 185,
+        Tone.G: 196,
+        Tone.GS: 207.65,
+        Tone.A: 220,
+        Tone.AS: 233.08,
+        Tone.B: 246.94,
+    }[tone]
+
+
+def legacy_toX(tone: Tone, widthScale: int) -> list[int]:
+    return {
+        Tone.C: [
+            (widthScale * 0) + int(widthScale / 2),
+            (widthScale * 7) + int(widthScale / 2),
+        ],
+        Tone.CS: [(widthScale * 0) + widthScale],
+        Tone.D: [(widthScale * 1) + int(widthScale / 2)],
+        Tone.DS: [(widthScale * 1) + widthScale],
+        Tone.E: [(widthScale * 2) + int(widthScale / 2)],
+        Tone.F: [(widthScale * 3) + int(widthScale / 2)],
+        Tone.FS: [(widthScale * 3) + widthScale],
+        Tone.G: [(widthScale * 4) + int(widthScale / 2)],
+        Tone.GS: [(widthScale * 4) + widthScale],
+        Tone.A: [(widthScale * 5) + int(widthScale / 2)],
+        Tone.AS: [(widthScale * 5) + widthScale],
+        Tone.B: [(widthScale * 6) + int(widthScale / 2)],
+    }[tone]
+
+
+# Decorated like Tone.fromKey so both pay the same warning overhead
+@deprecated("Keyboard input no longer supported")
+def legacy_fromKey(key: int) -> Tone | None:
+    return {
+        constants.K_1: Tone.C,
+        constants.K_2: Tone.D,
+        constants.K_3: Tone.E,
+        constants.K_4: Tone.F,
+        constants.K_5: Tone.G,
+        constants.K_6: Tone.A,
+        constants.K_7: Tone.B,
+        constants.K_8: Tone.C,
+        constants.K_9: Tone.D,
+        constants.K_0: Tone.E,
+    }.get(key, None)
+
+
+def legacy_fromID(string: str) -> Tone:
+    return Tone(Tone._member_names_.index(string))
+
+
+def legacy_fromMidi(midi_key: int) -> Tone:
+    return Tone(midi_key % 12)
+
+
+def legacy_keys() -> list[Tone]:
+    return [
+        Tone.C,
+        Tone.CS,
+        Tone.D,
+        Tone.DS,
+        Tone.E,
+        Tone.F,
+        Tone.FS,
+        Tone.G,
+        Tone.GS,
+        Tone.A,
+        Tone.AS,
+        Tone.B,
+    ]
+
+
+def per_call(statement, number: int) -> float:
+    """
+    Best of five runs, in nanoseconds per call.
+    """
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--frame-lookups",
+        type=int,
+        default=300,
+        help="toX lookups per frame to estimate the saving for (e.g. visible notes)",
+    )
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    tones = list(Tone)
+    names = [tone.name for tone in tones]
+    cases = [
+        (
+            "freq",
+            lambda: [legacy_freq(tone) for tone in tones],
+            lambda: [tone.freq for tone in tones],
+        ),
+        (
+            "toX",
+            lambda: [legacy_toX(tone, WIDTH_SCALE) for tone in tones],
+            lambda: [tone.toX(WIDTH_SCALE) for tone in tones],
+        ),
+        (
+            "fromKey",
+            lambda: [legacy_fromKey(key) for key in range(48, 60)],
+            lambda: [Tone.fromKey(key) for key in range(48, 60)],
+        ),
+        (
+            "fromID",
+            lambda: [legacy_fromID(name) for name in names],
+            lambda: [Tone.fromID(name) for name in names],
+        ),
+        (
+            "fromMidi",
+            lambda: [legacy_fromMidi(key) for key in range(60, 72)],
+            lambda: [Tone.fromMidi(key) for key in range(60, 72)],
+        ),
+        ("keys", lambda: [legacy_keys()] * 12, lambda: [Tone.keys()] * 12),
+    ]
+
+    number = max(1, args.number // len(tones))
+    print(f"{'':10}{'before (ns)':>14}{'after (ns)':>14}{'speed-up':>10}")
+    results = {}
+    for name, before, after in cases:
+        old = per_call(before, number) / len(tones)
+        new = per_call(after, number) / len(tones)
+        results[name] = (old, new)
+        print(f"{name:10}{old:14.1f}{new:14.1f}{old / new:9.1f}x")
+
+    old, new = results["toX"]
+    saved = (old - new) * args.frame_lookups / 1e3
+    print(
+        f"\n{args.frame_lookups} toX lookups per frame: "
+        f"{old * args.frame_lookups / 1e3:.1f} us -> {new * args.frame_lookups / 1e3:.1f} us "
+        f"({saved:.1f} us saved per frame)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import struct
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any
+
+try:
+    from .settings import CHART_CACHE_DIR
+except:
+    from settings import CHART_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+MIDIBEATLENGTH = 480
+
+# Header of a compiled chart file:
+# magic, format version, source mtime (ns), source size, track count, note count
+_HEADER = struct.Struct("<4sHqqHI")
+_MAGIC = b"MCHT"
+_VERSION = 2  # 2: notes sorted by start time
+
+# Name and size of a chunk in a MIDI file
+_CHUNK = struct.Struct(">4sI")
+# Data bytes after each MIDI status byte (sysex and meta events carry a length)
+_DATA_BYTES = (
+    {status: 2 for status in range(0x80, 0xC0)}
+    | {status: 1 for status in range(0xC0, 0xE0)}
+    | {status: 2 for status in range(0xE0, 0xF0)}
+    | {0xF1: 1, 0xF2: 2, 0xF3: 1, 0xF6: 0}
+    | {status: 0 for status in (0xF8, 0xFA, 0xFB, 0xFC, 0xFE)}
+)
+
+
+class ChartTable:
+    """
+    Compiled notes of a single MIDI track, stored column-wise and sorted by
+    start time. time and duration are in beats, tone is the Tone value (0-11).
+    """
+
+    __slots__ = ("time", "duration", "tone")
+
+    def __init__(self, time: array, duration: array, tone: array) -> None:
+        self.time = time
+        self.duration = duration
+        self.tone = tone
+
+    def __len__(self) -> int:
+        return len(self.tone)
+
+    @staticmethod
+    def empty() -> ChartTable:
+        return ChartTable(array("d"), array("d"), array("B"))
+
+
+class _CacheEntry:
+    def __init__(self, stamp: tuple[int, int], track_count: int) -> None:
+        self.stamp = stamp
+        self.track_count = track_count
+        self.tables: dict[int, ChartTable] = {}
+
+
+# Source file -> compiled tracks, valid while the file's (mtime, size) is unchanged
+_memory_cache: dict[Path, _CacheEntry] = {}
+_metadata_cache: dict[Path, tuple[tuple[int, int], dict[str, Any]]] = {}
+# Branches are also built on the prefetch thread
+_lock = threading.RLock()
+
+
+def load_track(path: Path, index: int) -> ChartTable:
+    """
+    Return the compiled notes of track (index % track count) of the MIDI file at path.
+    Looks in memory first, then on disk, and only parses the MIDI file if neither
+    holds a table compiled from the file's current mtime and size.
+    """
+    with _lock:
+        return _load_track(path, index)
+
+
+def _load_track(path: Path, index: int) -> ChartTable:
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    entry = _memory_cache.get(path)
+    if entry is None or entry.stamp != stamp:
+        entry = _CacheEntry(stamp, read_track_count(path))
+        _memory_cache[path] = entry
+
+    track = index % entry.track_count
+    table = entry.tables.get(track)
+    if table is not None:
+        return table
+
+    table = _read_compiled(path, track, stamp)
+    if table is not None:
+        entry.tables[track] = table
+        return table
+
+    # Cold path: decode just this track from the MIDI file
+    logger.debug(f"Compiling chart {path} track {track}")
+    table = read_track(path, track)
+    entry.tables[track] = table
+    _write_compiled(path, track, stamp, entry.track_count, table)
+    return table
+
+
+def load_metadata(path: Path) -> dict[str, Any]:
+    """
+    Return the parsed branch .json file, re-reading it only when it has changed.
+    """
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _metadata_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with open(path) as jsonFile:
+            data = json.load(jsonFile)
+        _metadata_cache[path] = (stamp, data)
+        return data
+
+
+def read_track_count(path: Path) -> int:
+    """
+    Read the number of tracks from the MThd chunk without parsing the file.
+    """
+    with open(path, "rb") as midi:
+        header = midi.read(14)
+    if len(header) < 14 or header[:4] != b"MThd":
+        raise ValueError(f"{path} is not a MIDI file")
+    return max(1, int.from_bytes(header[10:12], "big"))
+
+
+def read_track(path: Path, index: int) -> ChartTable:
+    """
+    Compile track index of the MIDI file at path. Chunks before it are
+    skipped over without being read, and only its own bytes are decoded.
+    A file with fewer tracks than index gives an empty table.
+    """
+    with open(path, "rb") as midi:
+        name, size = _CHUNK.unpack(midi.read(_CHUNK.size))
+        if name != b"MThd":
+            raise ValueError(f"{path} is not a MIDI file")
+        midi.seek(size, 1)
+        track = 0
+        while len(header := midi.read(_CHUNK.size)) == _CHUNK.size:
+            name, size = _CHUNK.unpack(header)
+            # Chunks of any other type are to be ignored
+            if name == b"MTrk":
+                if track == index:
+                    try:
+                        return compile_track(midi.read(size))
+                    except (IndexError, KeyError) as error:
+                        raise ValueError(
+                            f"{path} track {index} is malformed"
+                        ) from error
+                track += 1
+            midi.seek(size, 1)
+    return ChartTable.empty()
+
+
+def compile_track(data: bytes) -> ChartTable:
+    """
+    Pair the note on/off events of an MTrk chunk's data into notes, without
+    building a message object per event. Meta events are skipped entirely
+    (including their delta time), sysex and other channel messages only
+    move the time on.
+    """
+    table = ChartTable.empty()
+    on_off: list[int | None] = [0] * 12
+    current_time = 0
+    status = 0  # Running status: a data byte in place of a status repeats this
+    position = 0
+    while position < len(data):
+        delta, position = _read_variable_int(data, position)
+        byte = data[position]
+        if byte >= 0x80:
+            position += 1
+            # Meta events don't set running status
+            if byte != 0xFF:
+                status = byte
+        elif status:
+            byte = status
+        else:
+            raise ValueError("Running status without a previous status byte")
+
+        if byte == 0xFF:
+            length, position = _read_variable_int(data, position + 1)
+            position += length
+            continue
+        current_time += delta
+        if byte == 0xF0 or byte == 0xF7:
+            length, position = _read_variable_int(data, position)
+            position += length
+            continue
+        if byte & 0xE0 != 0x80:
+            position += _DATA_BYTES[byte]
+            continue
+
+        # Note on (0x9n, whatever the velocity) or note off (0x8n)
+        current_tone = data[position] % 12
+        position += 2
+        if byte & 0xF0 == 0x90:
+            if not on_off[current_tone]:
+                on_off[current_tone] = current_time
+        elif start_time := on_off[current_tone]:
+            table.time.append(start_time / MIDIBEATLENGTH)
+            table.duration.append((current_time - start_time) / MIDIBEATLENGTH)
+            table.tone.append(current_tone)
+            on_off[current_tone] = None
+        else:
+            # Assume a mismatched note off means that the note began at the start of the midi track
+            table.time.append(0)
+            table.duration.append(current_time / MIDIBEATLENGTH)
+            table.tone.append(current_tone)
+    return _sorted_by_time(table)
+
+
+def _sorted_by_time(table: ChartTable) -> ChartTable:
+    # Notes are added when they end, so a held note comes after any that
+    # start while it is held. The sort is stable, so notes starting together
+    # keep their order
+    order = sorted(range(len(table)), key=table.time.__getitem__)
+    return ChartTable(
+        array("d", [table.time[i] for i in order]),
+        array("d", [table.duration[i] for i in order]),
+        array("B", [table.tone[i] for i in order]),
+    )
+
+
+def _read_variable_int(data: bytes, position: int) -> tuple[int, int]:
+    # 7 bits per byte, most significant first, the top bit set on all but the last
+    value = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, position
+
+
+def clear_memory_cache() -> None:
+    with _lock:
+        _memory_cache.clear()
+        _metadata_cache.clear()
+
+
+def _compiled_path(path: Path, track: int) -> Path:
+    # Hash of the source path keeps same-named files in different folders apart
+    digest = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:8]
+    return Path(CHART_CACHE_DIR) / f"{path.stem}-{digest}.{track}.chart"
+
+
+def _read_compiled(
+    path: Path, track: int, stamp: tuple[int, int]
+) -> ChartTable | None:
+    try:
+        data = _compiled_path(path, track).read_bytes()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, mtime_ns, size, _, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION or (mtime_ns, size) != stamp:
+        return None
+    if len(data) != _HEADER.size + count * 17:
+        return None
+
+    table = ChartTable.empty()
+    offset = _HEADER.size
+    table.time.frombytes(data[offset : offset + count * 8])
+    offset += count * 8
+    table.duration.frombytes(data[offset : offset + count * 8])
+    offset += count * 8
+    table.tone.frombytes(data[offset : offset + count])
+    if sys.byteorder != "little":
+        table.time.byteswap()
+        table.duration.byteswap()
+    return table
+
+
+def _write_compiled(
+    path: Path,
+    track: int,
+    stamp: tuple[int, int],
+    track_count: int,
+    table: ChartTable,
+) -> None:
+    time, duration = table.time, table.duration
+    if sys.byteorder != "little":
+        time, duration = array("d", time), array("d", duration)
+        time.byteswap()
+        duration.byteswap()
+    target = _compiled_path(path, track)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_suffix(".tmp")
+        with open(temp, "wb") as out:
+            out.write(_HEADER.pack(_MAGIC, _VERSION, *stamp, track_count, len(table)))
+            out.write(time.tobytes())
+            out.write(duration.tobytes())
+            out.write(table.tone.tobytes())
+        temp.replace(target)
+    except OSError as error:
+        # The in-memory copy still works, we just recompile next launch
+        logger.warning(f"Could not write chart cache {target}: {error}")
@@ -0,0 +1,52 @@
+from __future__ import annotations
+from collections import OrderedDict
+import pygame
+
+from .settings import FONT_FILE, TEXT_CACHE_SIZE
+
+# (file, size) -> Font, so each font is only loaded once per process
+_fonts: dict[tuple[str, int], pygame.font.Font] = {}
+
+# (font, text, colour, antialias) -> rendered text, least recently used first
+_text_surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+
+def get_font(size: int, file: str = FONT_FILE) -> pygame.font.Font:
+    """
+    Shared Font for file at size, loaded on first use.
+    """
+    key = (file, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(file, size)
+        _fonts[key] = font
+    return font
+
+
+def render_text(
+    font: pygame.font.Font,
+    text: str,
+    colour: tuple[int, int, int],
+    antialias: bool = True,
+) -> pygame.Surface:
+    """
+    font.render, but cached: the same text in the same font and colour is only
+    rasterised once while it stays among the TEXT_CACHE_SIZE most recently used.
+    The returned Surface is shared, so blit it rather than drawing on it.
+    """
+    key = (font, text, tuple(colour), antialias)
+    surface = _text_surfaces.get(key)
+    if surface is not None:
+        _text_surfaces.move_to_end(key)
+        return surface
+    surface = font.render(text, antialias, colour)
+    _text_surfaces[key] = surface
+    if len(_text_surfaces) > TEXT_CACHE_SIZE:
+        _text_surfaces.popitem(last=False)
+    return surface
+
+
+def clear_text_cache() -> None:
+    _text_surfaces.clear()
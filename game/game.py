@@ -1,9 +1,13 @@
-from typing import Literal
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Literal
 import pygame
 import pygame.midi
 from enum import Enum
 from pathlib import Path
 import logging
+import os
 
 from .settings import (
     HEIGHT,
@@ -14,9 +18,15 @@ from .settings import (
     MUSIC_FILE,
     MIDI,
     KEY_FLASH_TIME,
-    GHOST_FADE_TIME,
     SCORE_INCREMENT,
     MIDI_DEVICES,
+    FRAME_RATE,
+    SIMULATION_TICK_MS,
+    MAX_FRAME_TIME,
+    AUDIO_BUFFER,
+    AUDIO_SYNC_GAIN,
+    AUDIO_SYNC_SNAP,
+    SONGS_PER_PAGE,
 )
 from .subScreens import (
     draw_home_screen,
@@ -34,22 +44,31 @@ from .subScreens import (
     handle_tutorial_screen_click,
     draw_settings_screen,
     handle_settings_screen_click,
+    invalidate_screens,
 )
 from .player import Music
+from .fonts import get_font
+from .midi_input import MidiEvent, MidiReader, NOTE_ON, NOTE_OFF
 from .ui import (
     drawBeats,
     drawScale,
     drawPiano,
     drawHealth,
     labelsForNotes,
-    drawNote,
+    drawNotes,
     draw_ghosts,
     beatsToY,
     drawProgressBar,
     drawScore,
     drawTopBackground,
 )
-from .note_data import NoteData, Branch, Tone
+from .note_data import Branch, Tone
+from .note_queue import NoteQueue
+from .ghosts import GhostPool
+from .prefetch import BranchPrefetcher
+from .song_tree import SONG_START, SongTree, load_song_tree
+from .song_library import SongLibrary
+from .profiler import FrameProfiler
 
 logger = logging.getLogger(__name__)
 
@@ -68,34 +87,69 @@ class GameState(Enum):
 
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        pygame.midi.init()
-        MIDI_DEVICES.clear()
-        for i in range(pygame.midi.get_count()):
-            info = pygame.midi.get_device_info(i)
-            is_input = bool(info[2])
-            if is_input:
-                device_name = info[1].decode()
-                MIDI_DEVICES.append(device_name)
+    def __init__(
+        self,
+        profile: bool = False,
+        profile_dump: Path | None = None,
+        headless: bool = False,
+        midi_input: pygame.midi.Input | None = None,
+        midi_clock: Callable[[], int] | None = None,
+    ):
+        """
+        headless runs without a window, sound card or MIDI hardware (SDL's
+        dummy drivers), for benchmarks and scripted runs. midi_input replaces
+        the MIDI device (e.g. a midi_input.ScriptedInput); headless, it is read
+        on the game thread rather than a reader thread. midi_clock is the
+        clock its timestamps are on, pygame.midi.time by default.
+
+        Only what the home screen needs is set up here. The song library is
+        scanned, MIDI devices are listed and the backing track is loaded on
+        the startup thread, in that order, the first songs' charts are built
+        by the prefetcher, and the MIDI device is opened when a song starts.
+        """
+        self.init_time = perf_counter()
+        self.first_frame_time: float | None = None
+        self.headless = headless
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        # Buffer size must be set before the startup thread opens the mixer
+        pygame.mixer.pre_init(buffer=AUDIO_BUFFER)
+        pygame.display.init()
+        pygame.font.init()
+
+        self.startup = ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup")
+        # Songs are listed while the home screen is shown, so they are scanned
+        # first rather than after the backing track is decoded
+        self.library = SongLibrary()
+        self.song_page = 0
+        self.startup.submit(self.library.scan)
+        self.midi_ready: Future[None] | None = None
+        if MIDI and not headless and midi_input is None:
+            self.midi_ready = self.startup.submit(self.find_midi_devices)
+        self.music_loaded: Future[Music] = self.startup.submit(Music, Path(MUSIC_FILE))
 
         self.width = AMOUNT_OF_NOTES * WIDTH_SCALE
         self.height = HEIGHT
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Melodify")
-        logo = pygame.image.load("./logo_sm.png")
-        pygame.display.set_icon(logo)
+        if not headless:
+            logo = pygame.image.load("./logo_sm.png")
+            pygame.display.set_icon(logo)
 
+        # Creating the clock also starts pygame's timer (get_ticks)
         self.clock = pygame.time.Clock()
+        self.profiler = FrameProfiler(profile, profile_dump)
         self.running = True
         self.state = GameState.HOME
 
         self.time = 0.0
-        pygame.font.init()
-        self.font = pygame.font.Font("freesansbold.ttf", 32)
+        # Real time (ms) not yet simulated, always less than one SIMULATION_TICK_MS
+        self.sim_accumulator = 0.0
+        self.font = get_font(32)
 
-        self.scoreFont = pygame.font.Font("freesansbold.ttf", 20)
-        self.white_font = pygame.font.Font("freesansbold.ttf", 20)
+        self.scoreFont = get_font(20)
+        self.white_font = get_font(20)
 
         self.health = MAX_HEALTH
         self.colour_flash = None
@@ -103,66 +157,111 @@ class Game:
 
         self.pressedKeys: dict[Tone, bool] = {tone: False for tone in Tone}
 
-        # Per-key feedback: tone -> ("hit"/"miss", frames_left), or (None, 0) if no feedback
+        # Per-key feedback: tone -> ("hit"/"miss", ms_left), or (None, 0) if no feedback
         self.key_feedback: dict[
             Tone, tuple[Literal["hit"] | Literal["miss"] | None, int]
         ] = {tone: (None, 0) for tone in Tone}
 
-        self.music = Music(Path(MUSIC_FILE))
-
         self.speed = int(60000 / BPM)
 
-        # Branch/notes
-        self.currentBranch = Branch(0, "a", start_time=4)
-        next_branch_name = (
-            self.currentBranch.next_branch_name or self.currentBranch.name
-        )
-        if next_branch_name:
-            self.queuedBranches = (
-                Branch(1, next_branch_name, start_time=self.currentBranch.end_time),
-                Branch(2, next_branch_name, start_time=self.currentBranch.end_time),
-            )
-        else:
-            self.queuedBranches = None
-        self.notes = self.melody()
-
-        if MIDI:
-            self.midiInput = self.midiConnect()
-        else:
+        # Branch/notes, set when a song starts
+        self.prefetcher = BranchPrefetcher()
+        self.song: SongTree | None = None
+        self.currentBranch: Branch | None = None
+        self.queuedBranches: tuple[Branch, ...] | None = None
+        self.notes = NoteQueue()
+        self.song_time = 0.0
+        self.startup.submit(self.preload_songs)
+
+        self.midiInput = None
+        self.midiReader = None
+        self.midi_clock = midi_clock or pygame.midi.time
+        if midi_input is not None:
+            if midi_clock is None:
+                pygame.midi.init()
+            self.midiInput = midi_input
+            self.midiReader = MidiReader(self.midiInput)
+            if not headless:
+                self.midiReader.start()
+        elif self.midi_ready is None:
             logger.debug("MIDI disabled")
+        # MIDI events waiting for the simulation tick they happened in
+        self.pendingMidiEvents: deque[MidiEvent] = deque()
 
         # Pause / Countdown
         self.paused_background = None
         self.countdown_value = 3
         self.countdown_start_time = 0
 
-        self.ghosts = []  # Dict: {tone, color, frames_left}
+        # State whose screen is on the display, menus only redraw what changed
+        self.drawn_state = None
+
+        self.ghosts = GhostPool()
 
         # Each segment: {start: time_in_beats, end: optional_time_in_beats or None, color, fade_start: None/int}
         # The last segment is active if 'end' is None
-        self.progress_segments = [
-            {
-                "start": 0.0,
-                "end": None,
-                "color": self.currentBranch.colour,
-            }
-        ]
-        self.old_circle_color = self.currentBranch.colour
+        self.progress_segments = []
+        self.old_circle_color = (0, 0, 0)
         self.circle_fade_start = 0.0
 
         # Score & Leaderboard
         self.score = 0
+        # Timing of each hit in ms, negative is early and positive is late
+        self.hit_offsets: list[float] = []
         self.game_over_score = 0
         self.leaderboard = []  # Store all final scores TODO: Actually save it
 
         logger.debug("Game initialized")
 
-    def run(self):
+    @property
+    def music(self) -> Music:
+        # Loaded on the startup thread, only waits if a song starts before then
+        return self.music_loaded.result()
+
+    def preload_songs(self) -> None:
+        """
+        Build the start of the songs on the library's first page, so
+        whichever is chosen is ready. Runs once the library is scanned.
+        """
+        songs = self.library.songs[:SONGS_PER_PAGE]
+        self.prefetcher.preload((0, song.first_branch, SONG_START) for song in songs)
+        for song in songs:
+            load_song_tree(song.first_branch)
+
+    def find_midi_devices(self) -> None:
+        """
+        Initialise PortMidi and list the input devices for the settings page.
+        Runs on the startup thread, as both can take a while.
+        """
+        pygame.midi.init()
+        MIDI_DEVICES.clear()
+        for i in range(pygame.midi.get_count()):
+            info = pygame.midi.get_device_info(i)
+            is_input = bool(info[2])
+            if is_input:
+                device_name = info[1].decode()
+                MIDI_DEVICES.append(device_name)
+
+    def connect_midi(self) -> None:
+        """
+        Open the MIDI device and start reading it, the first time a song starts.
+        """
+        if self.midiReader or self.midi_ready is None:
+            return
+        self.midi_ready.result()
+        self.midiInput = self.midiConnect()
+        self.midiReader = MidiReader(self.midiInput)
+        self.midiReader.start()
+
+    def run(self, frames: int | None = None):
         """
         Main game loop: Poll events, update the current state, draw everything, then flip the display.
+        frames stops the loop after that many frames, for headless runs.
         """
+        profiler = self.profiler
         while self.running:
-            events = pygame.event.get()
+            with profiler.section("events"):
+                events = pygame.event.get()
             for event in events:
                 if event.type == pygame.QUIT:
                     old_state = self.state
@@ -185,8 +284,14 @@ class Game:
                         self.state = GameState.PAUSE
                         logger.info(f"State changed: {old_state} -> {self.state}")
 
+            if self.state != self.drawn_state:
+                invalidate_screens()
+                self.drawn_state = self.state
+            # Rects of the display that changed, None for all of it
+            updated = None
+
             if self.state == GameState.HOME:
-                draw_home_screen(self.screen, self.font)
+                updated = draw_home_screen(self.screen, self.font)
                 action = handle_home_screen_click(events)
                 if action == "start":
                     logger.info(f"State changed: {self.state} -> SONG_SELECTION")
@@ -203,24 +308,32 @@ class Game:
                     logger.info(f"State changed: {old_state} -> {self.state}")
 
             elif self.state == GameState.SONG_SELECTION:
-                draw_song_selection_screen(self.screen, self.font)
+                updated = draw_song_selection_screen(
+                    self.screen, self.font, self.library, self.song_page
+                )
                 song_action = handle_song_selection_screen_click(events)
                 if song_action == "back":
                     old_state = self.state
                     self.state = GameState.HOME
                     logger.info(f"State changed: {old_state} -> {self.state}")
+                elif song_action and song_action.startswith("page:"):
+                    self.song_page = int(song_action.split("page:")[1])
                 elif song_action and song_action.startswith("song:"):
-                    # E.g. "song:Song A"
-                    chosen_song = song_action.split("song:")[1]
-                    logger.info(f"Song chosen: {chosen_song}")
-                    # Temp, just reset game with that as a branch name TODO: Change
-                    self.reset_game_for_song(chosen_song.lower()[-1])
-                    old_state = self.state
-                    self.state = GameState.PLAYING
-                    logger.info(f"State changed: {old_state} -> {self.state}")
+                    # E.g. "song:song_a"
+                    song_key = song_action.split("song:")[1]
+                    chosen_song = self.library.get(song_key)
+                    if chosen_song is None:
+                        # Left the library in a rescan since the screen was drawn
+                        logger.warning(f"Song {song_key} is no longer listed")
+                    else:
+                        logger.info(f"Song chosen: {chosen_song.title}")
+                        self.reset_game_for_song(chosen_song.first_branch)
+                        old_state = self.state
+                        self.state = GameState.PLAYING
+                        logger.info(f"State changed: {old_state} -> {self.state}")
 
             elif self.state == GameState.TUTORIAL:
-                draw_tutorial_screen(self.screen, self.font)
+                updated = draw_tutorial_screen(self.screen, self.font)
                 lb_action = handle_tutorial_screen_click(events)
                 if lb_action == "back":
                     old_state = self.state
@@ -228,12 +341,17 @@ class Game:
                     logger.info(f"State changed: {old_state} -> {self.state}")
 
             elif self.state == GameState.PLAYING:
-                self.update_pressed_keys()
-                self.update_game()
-                self.draw_game()
+                with profiler.section("update_pressed_keys"):
+                    self.update_pressed_keys()
+                with profiler.section("update_game"):
+                    self.update_game()
+                with profiler.section("draw_game"):
+                    self.draw_game()
 
             elif self.state == GameState.PAUSE:
-                draw_pause_screen(self.screen, self.paused_background, self.font)
+                updated = draw_pause_screen(
+                    self.screen, self.paused_background, self.font
+                )
                 pause_action = handle_pause_screen_click(events)
                 if pause_action == "resume":
                     old_state = self.state
@@ -246,14 +364,16 @@ class Game:
 
             elif self.state == GameState.COUNTDOWN:
                 self.update_countdown()
-                draw_countdown_screen(
+                updated = draw_countdown_screen(
                     self.screen, self.paused_background, self.countdown_value
                 )
 
             elif self.state == GameState.GAME_OVER:
                 self.music.stop()
                 # Pass the final score (game_over_score) to the draw function
-                draw_game_over_screen(self.screen, self.font, self.game_over_score)
+                updated = draw_game_over_screen(
+                    self.screen, self.font, self.game_over_score
+                )
                 action = handle_game_over_screen_click(events)
                 if action == "again":
                     self.reset_game()
@@ -270,15 +390,17 @@ class Game:
                     logger.info(f"State changed: {old_state} -> {self.state}")
 
             elif self.state == GameState.LEADERBOARD:
-                draw_leaderboard_screen(self.screen, self.font, self.leaderboard)
-                lb_action = handle_leaderboard_screen_click(events, self.screen)
+                updated = draw_leaderboard_screen(
+                    self.screen, self.font, self.leaderboard
+                )
+                lb_action = handle_leaderboard_screen_click(events)
                 if lb_action == "back":
                     old_state = self.state
                     self.state = GameState.GAME_OVER
                     logger.info(f"State changed: {old_state} -> {self.state}")
 
             elif self.state == GameState.SETTINGS:
-                draw_settings_screen(self.screen, self.font)
+                updated = draw_settings_screen(self.screen, self.font)
                 settings_action = handle_settings_screen_click(events)
                 if settings_action == "back":
                     old_state = self.state
@@ -288,17 +410,42 @@ class Game:
             elif self.state == GameState.QUIT:
                 self.running = False
 
-            pygame.display.flip()
-            self.clock.tick(60)
-
+            overlay = profiler.draw_overlay(self.screen)
+            if overlay and updated is not None:
+                updated.append(overlay)
+            with profiler.section("display.flip"):
+                if updated is None:
+                    pygame.display.flip()
+                elif updated:
+                    pygame.display.update(updated)
+            if self.first_frame_time is None:
+                self.first_frame_time = perf_counter()
+                logger.info(
+                    f"First frame shown {(self.first_frame_time - self.init_time) * 1000:.0f}ms after start"
+                )
+            with profiler.section("idle (clock.tick)"):
+                self.clock.tick(FRAME_RATE)
+            profiler.end_frame()
+            if frames is not None:
+                frames -= 1
+                self.running = frames > 0
+
+        profiler.dump()
+        self.prefetcher.close()
+        self.startup.shutdown(cancel_futures=True)
+        if self.midiReader:
+            self.midiReader.close()
         pygame.quit()
 
     def reset_game_for_song(self, song_name: str):
         """
         Similar to reset_game, but loads 'song_name' as the branch name.
         """
+        self.connect_midi()
         self.health = MAX_HEALTH
         self.time = 0
+        self.sim_accumulator = 0.0
+        self.discard_midi_input()
         self.colour_flash = None
         self.flash_timer = 0
         self.music.stop()
@@ -306,34 +453,14 @@ class Game:
 
         self.score = 0
         self.game_over_score = 0
+        self.hit_offsets.clear()
 
-        self.currentBranch = Branch(0, song_name, start_time=4)
-        next_branch_name = (
-            self.currentBranch.next_branch_name or self.currentBranch.name
-        )
-        if next_branch_name:
-            self.queuedBranches = (
-                Branch(1, next_branch_name, start_time=self.currentBranch.end_time),
-                Branch(2, next_branch_name, start_time=self.currentBranch.end_time),
-            )
-        else:
-            self.queuedBranches = None
-
-        self.notes = self.melody()
+        self.load_song(song_name)
 
         for tone in self.key_feedback:
             self.key_feedback[tone] = (None, 0)
 
         self.ghosts.clear()
-        self.progress_segments = [
-            {
-                "start": 0.0,
-                "end": None,
-                "color": self.currentBranch.colour,
-            }
-        ]
-        self.old_circle_color = self.currentBranch.colour
-        self.circle_fade_start = 0.0
 
     def reset_game(self):
         """
@@ -341,28 +468,32 @@ class Game:
         """
         self.health = MAX_HEALTH
         self.time = 0
+        self.sim_accumulator = 0.0
+        self.discard_midi_input()
         self.colour_flash = None
         self.flash_timer = 0
         self.music.stop()
 
         self.score = 0
+        self.hit_offsets.clear()
 
-        self.currentBranch = Branch(0, "a", start_time=4)
-        next_branch_name = (
-            self.currentBranch.next_branch_name or self.currentBranch.name
-        )
-        if next_branch_name:
-            self.queuedBranches = (
-                Branch(1, next_branch_name, start_time=self.currentBranch.end_time),
-                Branch(2, next_branch_name, start_time=self.currentBranch.end_time),
-            )
-        else:
-            self.queuedBranches = None
-        self.notes = self.melody()
+        self.load_song(self.song.song)
         for tone in self.key_feedback:
             self.key_feedback[tone] = (None, 0)
         self.ghosts.clear()
 
+    def load_song(self, song_name: str) -> None:
+        """
+        Put the first branch of song_name and the pair that follows it in play.
+        """
+        self.song = load_song_tree(song_name)
+        # Normally built while the menus were shown
+        self.currentBranch = self.prefetcher.get(*self.song.root.key)
+        self.queuedBranches = self.next_branches()
+        self.prefetcher.prefetch(self.queuedBranches or (), self.song.root.key)
+        self.song_time = self.totalSongTime()
+        self.notes = self.melody()
+
         self.progress_segments = [
             {
                 "start": 0.0,
@@ -373,9 +504,49 @@ class Game:
         self.old_circle_color = self.currentBranch.colour
         self.circle_fade_start = 0.0
 
-    def update_game(self):
+    def next_branches(self) -> tuple[Branch, ...] | None:
         """
-        Update main game logic (timing, note hits, health, branch transitions).
+        The branches that can follow the current one, None at the end of the song.
+        """
+        children = self.song.node(self.currentBranch).children
+        if not children:
+            return None
+        # Normally built ahead of time by the prefetcher
+        return tuple(self.prefetcher.get(*key) for key in children)
+
+    def update_game(self, elapsed_ms: float | None = None):
+        """
+        Advance the game by the real time since the last frame (or elapsed_ms),
+        in fixed SIMULATION_TICK_MS steps so judgement does not depend on frame rate.
+        """
+        if elapsed_ms is None:
+            elapsed_ms = self.sync_to_audio(self.clock.get_time())
+        # Clamp so a long stall doesn't make us run thousands of ticks in one frame
+        self.sim_accumulator += min(elapsed_ms, MAX_FRAME_TIME)
+        now = self.midi_clock() if self.midiReader else 0
+        while (
+            self.sim_accumulator >= SIMULATION_TICK_MS
+            and self.state == GameState.PLAYING
+        ):
+            self.sim_accumulator -= SIMULATION_TICK_MS
+            # Apply key presses in the tick they happened in, at the beat they happened on
+            tick_end = now - self.sim_accumulator
+            tick_end_beat = self.time + self.time_to_beats(SIMULATION_TICK_MS)
+            while (
+                self.pendingMidiEvents
+                and self.pendingMidiEvents[0].timestamp <= tick_end
+            ):
+                event = self.pendingMidiEvents.popleft()
+                event_beat = tick_end_beat - self.time_to_beats(
+                    tick_end - event.timestamp
+                )
+                self.apply_midi_event(event, max(event_beat, self.time))
+            self.step(SIMULATION_TICK_MS)
+
+    def step(self, tick_ms: float):
+        """
+        Simulate one fixed tick: timing, missed notes, health and timers.
+        Hits are judged per key press in judge_press.
         """
         if self.health <= 0:
             self.music.stop()
@@ -387,62 +558,26 @@ class Game:
             logger.info(f"State changed: {old_state} -> {self.state}")
             return
 
-        raw_time_ms = self.clock.get_time()
-        self.time += self.time_to_beats(raw_time_ms)
-        self.flash_timer -= 1
+        self.time += self.time_to_beats(tick_ms)
+        self.flash_timer -= tick_ms
         if self.flash_timer <= 0:
             self.colour_flash = None
 
-        off_screen_notes = [note for note in self.notes if note.isOffScreen(self.time)]
-        for note in off_screen_notes:
-            if note in self.notes:
-                self.notes.remove(note)
+        for note in self.notes.expire(self.time):
             old_health = self.health
             self.health -= 1
             logger.debug(f"Health changed: {old_health} -> {self.health}")
             self.key_feedback[note.tone] = ("miss", KEY_FLASH_TIME)
 
-        hittable_notes = [note for note in self.notes if note.isHittable(self.time)]
-        hit_notes = [note for note in hittable_notes if self.pressedKeys[note.tone]]
-        for note in hit_notes:
-            # If branch possible
-            if note.branch != self.currentBranch:
-                # Check for similar hittable notes (inc. note)
-                similar_notes = [n for n in hit_notes if n.tone == note.tone]
-                # If note is only similar note, switch branch
-                if len(similar_notes) == 1:
-                    self.nextBranch(note.branch)
-
-            # Mark a "hit"
-            self.key_feedback[note.tone] = ("hit", KEY_FLASH_TIME)
-
-            self.score += SCORE_INCREMENT
-
-            ghost_y_position = beatsToY(note.time, self.time)
-            self.ghosts.append(
-                {
-                    "tone": note.tone,
-                    "color": (0, 0, 0),
-                    "frames_left": GHOST_FADE_TIME,
-                    "y_position": ghost_y_position,
-                }
-            )
-
-        for note in hit_notes:
-            if note in self.notes:
-                self.notes.remove(note)
-
         # Decrement each key's flash timer
-        for tone, (status, frames_left) in self.key_feedback.items():
-            if frames_left > 0:
-                self.key_feedback[tone] = (status, frames_left - 1)
-            else:
+        for tone, (status, time_left) in self.key_feedback.items():
+            if time_left > 0:
+                self.key_feedback[tone] = (status, time_left - tick_ms)
+            elif status is not None:
                 self.key_feedback[tone] = (None, 0)
 
-        # Decrement ghost frames
-        for ghost in self.ghosts:
-            ghost["frames_left"] -= 1
-        self.ghosts = [g for g in self.ghosts if g["frames_left"] > 0]
+        # Age ghosts
+        self.ghosts.advance(tick_ms)
 
         # If no more notes:
         if not self.notes and not self.queuedBranches:
@@ -458,59 +593,64 @@ class Game:
         """
         Draw everything for the gameplay state.
         """
+        section = self.profiler.section
         self.screen.fill((255, 255, 255))
-        drawScale(self.screen, self.width, self.height)
-
-        drawBeats(self.screen, 5, self.time)
-
-        drawPiano(
-            screen=self.screen,
-            width=self.width,
-            height=self.height,
-            pressed_keys=self.pressedKeys,
-            font=self.font,
-            piano_height=100,
-            key_feedback=self.key_feedback,
-        )
+        with section("drawScale"):
+            drawScale(self.screen, self.width, self.height)
+
+        with section("drawBeats"):
+            drawBeats(self.screen, 5, self.time)
+
+        with section("drawPiano"):
+            drawPiano(
+                screen=self.screen,
+                width=self.width,
+                height=self.height,
+                pressed_keys=self.pressedKeys,
+                font=self.font,
+                piano_height=100,
+                key_feedback=self.key_feedback,
+            )
 
-        for note in self.notes:
-            drawNote(self.screen, note, self.time)
+        with section("drawNotes"):
+            drawNotes(self.screen, self.notes, self.time)
 
-        drawTopBackground(self.screen)
+        with section("drawTopBackground"):
+            drawTopBackground(self.screen)
 
-        draw_ghosts(self.screen, self.ghosts)
+        with section("draw_ghosts"):
+            draw_ghosts(self.screen, self.ghosts)
 
         # Draw health (200px on the right side for the score)
         health_bar_width = self.width - 200
-        drawHealth(self.screen, health_bar_width, self.health, MAX_HEALTH)
+        with section("drawHealth"):
+            drawHealth(self.screen, health_bar_width, self.health, MAX_HEALTH)
 
         # Draw score in the top-right corner
-        drawScore(self.screen, self.score, self.width, self.scoreFont)
-
-        drawProgressBar(
-            screen=self.screen,
-            segments=self.progress_segments,
-            current_time=self.time,
-            total_time=self.totalSongTime(),
-            old_circle_color=self.old_circle_color,
-            new_circle_color=self.currentBranch.colour,
-            circle_fade_start=self.circle_fade_start,
-        )
+        with section("drawScore"):
+            drawScore(self.screen, self.score, self.width, self.scoreFont)
+
+        with section("drawProgressBar"):
+            drawProgressBar(
+                screen=self.screen,
+                segments=self.progress_segments,
+                current_time=self.time,
+                total_time=self.song_time,
+                old_circle_color=self.old_circle_color,
+                new_circle_color=self.currentBranch.colour,
+                circle_fade_start=self.circle_fade_start,
+            )
 
-        labelsForNotes(self.screen, self.width, self.height, self.font)
+        with section("labelsForNotes"):
+            labelsForNotes(self.screen, self.width, self.height, self.font)
 
-    def melody(self) -> list[NoteData]:
+    def melody(self) -> NoteQueue:
         """
-        Builds or rebuilds the list of notes from current and queued branches then sorts them by note time.
+        Builds the note queue from the current and queued branches, one sorted stream per branch.
         """
         if self.queuedBranches:
-            return sorted(
-                self.currentBranch.notes
-                + self.queuedBranches[0].notes
-                + self.queuedBranches[1].notes,
-                key=lambda note: note.time,
-            )
-        return sorted(self.currentBranch.notes, key=lambda note: note.time)
+            return NoteQueue(self.currentBranch, *self.queuedBranches)
+        return NoteQueue(self.currentBranch)
 
     def nextBranch(self, next_branch: Branch) -> None:
         """
@@ -541,41 +681,88 @@ class Game:
         self.old_circle_color = old_color
         self.circle_fade_start = self.time
 
-        next_branch_name = (
-            self.currentBranch.next_branch_name or self.currentBranch.name
+        self.queuedBranches = self.next_branches()
+        logger.debug(
+            f"Branch prefetch hits: {self.prefetcher.hits}, misses: {self.prefetcher.misses}"
         )
-        end_time = self.currentBranch.end_time
-        id1, id2 = self.currentBranch.next_branch_ids
-        if next_branch_name:
-            self.queuedBranches = (
-                Branch(id1, next_branch_name, start_time=end_time),
-                Branch(id2, next_branch_name, start_time=end_time),
-            )
-        else:
-            self.queuedBranches = None
-        self.notes = self.melody()
+        self.prefetcher.prefetch(self.queuedBranches or (), self.song.root.key)
+        self.song_time = self.totalSongTime()
+
+        # Keep what is left of the chosen branch, drop its sibling and add the new pair
+        self.notes.retain(self.currentBranch)
+        if self.queuedBranches:
+            for branch in self.queuedBranches:
+                self.notes.push(branch)
 
     def update_pressed_keys(self) -> None:
         """
-        Poll MIDI data and update which notes are currently pressed.
+        Collect the MIDI events the reader thread has received since the last frame.
+        update_game applies them to pressedKeys at the tick matching their timestamp.
         """
-        if not self.midiInput:
+        if not self.midiReader:
             return
-        if not self.midiInput.poll():
+        self.pendingMidiEvents.extend(self.midiReader.drain())
+
+    def discard_midi_input(self) -> None:
+        """
+        Drop the MIDI events received outside PLAYING (paused, counting down or
+        in the menus), so presses made then are never judged once play starts.
+        Which keys are held is still kept up to date.
+        """
+        if self.midiReader:
+            self.pendingMidiEvents.extend(self.midiReader.drain())
+        for event in self.pendingMidiEvents:
+            if event.status in (NOTE_ON, NOTE_OFF):
+                self.pressedKeys[Tone.fromMidi(event.note)] = (
+                    event.status == NOTE_ON and event.velocity > 0
+                )
+        self.pendingMidiEvents.clear()
+
+    def apply_midi_event(self, event: MidiEvent, beat_time: float) -> None:
+        """
+        Update which notes are currently pressed from one MIDI event that
+        happened at beat_time, judging it if it is a key press.
+        """
+        tone = Tone.fromMidi(event.note)
+        logger.debug(
+            f"MIDI event: status={event.status}, tone={tone}, velocity={event.velocity}, timestamp={event.timestamp}"
+        )
+        if event.status == NOTE_ON:
+            self.pressedKeys[tone] = event.velocity > 0
+            if event.velocity > 0:
+                self.judge_press(tone, beat_time)
+        elif event.status == NOTE_OFF:
+            self.pressedKeys[tone] = False
+
+    def judge_press(self, tone: Tone, beat_time: float) -> None:
+        """
+        Score a key press against the nearest unjudged note of its tone in each
+        branch. Only presses score, so holding a key can't hit later notes.
+        """
+        matches = self.notes.nearest(tone, beat_time)
+        if not matches:
             return
-        if self.midiInput.poll:
-            for event in self.midiInput.read(10):
-                data = event[0]
-                if isinstance(data, list):
-                    status, note, velocity, _ = data
-                    tone = Tone.fromMidi(note)
-                    logger.debug(
-                        f"MIDI event: status={status}, tone={tone}, velocity={velocity}"
-                    )
-                    if status == 144:
-                        self.pressedKeys[tone] = velocity > 0
-                    elif status == 128:
-                        self.pressedKeys[tone] = False
+        hit_notes = [stream[index] for stream, index in matches]
+        for stream, index in matches:
+            stream.judge(index)
+
+        for note in hit_notes:
+            # If branch possible, and the press isn't shared with another branch's note
+            if note.branch != self.currentBranch and len(hit_notes) == 1:
+                self.nextBranch(note.branch)
+
+            # Mark a "hit"
+            self.key_feedback[note.tone] = ("hit", KEY_FLASH_TIME)
+
+            self.score += SCORE_INCREMENT
+
+            # Negative is early, positive is late
+            offset_ms = (beat_time - note.time) * 60000.0 / BPM
+            self.hit_offsets.append(offset_ms)
+            logger.debug(f"Hit {note.tone} {'late' if offset_ms > 0 else 'early'} by {abs(offset_ms):.1f}ms")
+
+            ghost_y_position = beatsToY(note.time, beat_time)
+            self.ghosts.spawn(note.tone, ghost_y_position, (0, 0, 0))
 
     def midiConnect(self) -> pygame.midi.Input:
         """
@@ -592,6 +779,22 @@ class Game:
         logger.info(f"Using MIDI device ID: {input_id}")
         return pygame.midi.Input(input_id)
 
+    def sync_to_audio(self, elapsed_ms: float) -> float:
+        """
+        Adjust this frame's elapsed time so the game clock converges on the backing
+        track's playback position: small drift is corrected by AUDIO_SYNC_GAIN each
+        frame, anything beyond AUDIO_SYNC_SNAP is corrected at once.
+        """
+        audio_ms = self.music.position()
+        if audio_ms is None:
+            return elapsed_ms
+        game_ms = self.time * 60000.0 / BPM + self.sim_accumulator + elapsed_ms
+        drift = audio_ms - game_ms
+        if abs(drift) > AUDIO_SYNC_SNAP:
+            logger.debug(f"Audio drift {drift:.1f}ms, snapping to audio clock")
+            return max(0.0, elapsed_ms + drift)
+        return max(0.0, elapsed_ms + drift * AUDIO_SYNC_GAIN)
+
     @staticmethod
     def time_to_beats(raw_time_ms: float) -> float:
         """
@@ -604,6 +807,7 @@ class Game:
         Switch to PAUSE state, store a blurred background.
         """
         self.state = GameState.PAUSE
+        self.discard_midi_input()
         self.draw_game()
         pygame.display.flip()
         self.paused_background = self.create_blurred_surface()
@@ -623,6 +827,8 @@ class Game:
         elapsed = pygame.time.get_ticks() - self.countdown_start_time
         new_val = 3 - (elapsed // 1000)
         if new_val <= 0:
+            # Presses during the countdown are not judged at the first tick
+            self.discard_midi_input()
             old_state = self.state
             self.state = GameState.PLAYING
             logger.info(f"State changed: {old_state} -> {self.state}")
@@ -647,12 +853,8 @@ class Game:
 
     def totalSongTime(self) -> float:
         """
-        Calculate estimate for total time in beats for the entire track.
-        For demo, guess the end_time of the last branch is the final.
-        This doesn't actually work well but it looks good enough.
+        When (in beats) the song ends on the longest path still open from the
+        current branch, exact once the last branch has been chosen.
+        Only changes with the branches, so it is kept in self.song_time.
         """
-        candidate_times = [self.currentBranch.end_time]
-        if self.queuedBranches:
-            for br in self.queuedBranches:
-                candidate_times.append(br.end_time)
-        return max(candidate_times)
+        return self.song.node(self.currentBranch).latest_end
@@ -0,0 +1,70 @@
+from __future__ import annotations
+from typing import Iterator
+
+from .settings import GHOST_FADE_TIME, GHOST_POOL_SIZE
+from .note_data import Tone
+
+
+class GhostPool:
+    """
+    Fixed-capacity ring buffer of the rings left where notes were hit.
+    Slots are allocated once and reused, and a ghost's age is read off a
+    running clock rather than counted down, so spawning and advancing cost
+    the same however many ghosts are alive. Every ghost lives for
+    GHOST_FADE_TIME ms, so the live ones are always the newest few; when the
+    pool is full the oldest is overwritten.
+    """
+
+    def __init__(self, capacity: int = GHOST_POOL_SIZE) -> None:
+        self.capacity = capacity
+        self.tones: list[Tone | None] = [None] * capacity
+        self.colours: list[tuple[int, int, int]] = [(0, 0, 0)] * capacity
+        self.ys: list[float] = [0.0] * capacity
+        self.born: list[float] = [0.0] * capacity
+        self.clock = 0.0  # ms
+        self.next = 0  # Slot the next ghost is written to
+        self.count = 0  # Slots written since the last clear, up to capacity
+
+    def spawn(self, tone: Tone, y: float, colour: tuple[int, int, int]) -> None:
+        slot = self.next
+        self.tones[slot] = tone
+        self.colours[slot] = colour
+        self.ys[slot] = y
+        self.born[slot] = self.clock
+        self.next = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def advance(self, ms: float) -> None:
+        self.clock += ms
+
+    def clear(self) -> None:
+        self.tones[:] = [None] * self.capacity
+        self.next = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        live = 0
+        for _ in self._live_slots():
+            live += 1
+        return live
+
+    def __iter__(self) -> Iterator[tuple[Tone, tuple[int, int, int], float, float]]:
+        """
+        (tone, colour, time_left, y) of every live ghost, oldest first.
+        """
+        slots = list(self._live_slots())
+        for slot in reversed(slots):
+            yield (
+                self.tones[slot],
+                self.colours[slot],
+                GHOST_FADE_TIME - (self.clock - self.born[slot]),
+                self.ys[slot],
+            )
+
+    def _live_slots(self) -> Iterator[int]:
+        # Newest first, stopping at the first ghost that has faded
+        for age in range(1, self.count + 1):
+            slot = (self.next - age) % self.capacity
+            if self.clock - self.born[slot] >= GHOST_FADE_TIME:
+                return
+            yield slot
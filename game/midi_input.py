@@ -0,0 +1,119 @@
+from __future__ import annotations
+import logging
+import threading
+from collections import deque
+from typing import Callable, Iterable, NamedTuple
+import pygame.midi
+
+from .settings import MIDI_POLL_INTERVAL, MIDI_READ_BATCH
+
+logger = logging.getLogger(__name__)
+
+NOTE_ON = 144
+NOTE_OFF = 128
+
+
+class MidiEvent(NamedTuple):
+    status: int
+    note: int
+    velocity: int
+    timestamp: int  # PortMidi clock (ms), comparable with pygame.midi.time()
+
+
+class MidiReader:
+    """
+    Drains a MIDI input device on a background thread so bursts (chords, fast
+    runs) are never truncated or held back until the next frame. Events keep
+    the device timestamp and are handed to the game thread through a deque,
+    whose append and popleft are atomic, so neither side takes a lock.
+    """
+
+    def __init__(self, device: pygame.midi.Input) -> None:
+        self.device = device
+        self.events: deque[MidiEvent] = deque()
+        self._stop = threading.Event()
+        # Whether the thread was ever started, it is not alive once it stops
+        self._started = False
+        self._thread = threading.Thread(
+            target=self._run, name="midi-reader", daemon=True
+        )
+
+    def start(self) -> None:
+        self._started = True
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1)
+
+    def drain(self) -> list[MidiEvent]:
+        """
+        Return every event received since the last call, oldest first.
+        If the reader was never started (headless runs), the device is read
+        here on the calling thread instead, so input is deterministic.
+        """
+        if not self._started and not self._stop.is_set():
+            self._read_device()
+        drained = []
+        while self.events:
+            drained.append(self.events.popleft())
+        return drained
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self._read_device():
+                    self._stop.wait(MIDI_POLL_INTERVAL)
+            except pygame.midi.MidiException as error:
+                logger.warning(f"MIDI input stopped: {error}")
+                return
+
+    def _read_device(self) -> bool:
+        """
+        Move everything the device has buffered into events.
+        Returns False if there was nothing to read.
+        """
+        if not self.device.poll():
+            return False
+        for data, timestamp in self.device.read(MIDI_READ_BATCH):
+            if isinstance(data, list):
+                status, note, velocity, _ = data
+                self.events.append(MidiEvent(status, note, velocity, timestamp))
+        return True
+
+
+class ScriptedInput:
+    """
+    Stands in for a pygame.midi.Input, playing back a fixed list of events.
+    Each event is released once clock() reaches its timestamp, so with the
+    same clock driving the game (see Game's midi_clock) a script plays out
+    identically however fast the frames are run.
+    """
+
+    def __init__(
+        self,
+        events: Iterable[MidiEvent],
+        clock: Callable[[], int] = pygame.midi.time,
+    ) -> None:
+        self.events = deque(sorted(events, key=lambda event: event.timestamp))
+        self.clock = clock
+
+    def poll(self) -> bool:
+        return bool(self.events) and self.events[0].timestamp <= self.clock()
+
+    def read(self, max_events: int) -> list[list]:
+        # Same shape as pygame.midi.Input.read: [[status, data1, data2, data3], timestamp]
+        now = self.clock()
+        read = []
+        while (
+            self.events and len(read) < max_events and self.events[0].timestamp <= now
+        ):
+            event = self.events.popleft()
+            read.append(
+                [[event.status, event.note, event.velocity, 0], event.timestamp]
+            )
+        return read
+
+    def close(self) -> None:
+        self.events.clear()
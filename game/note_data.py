@@ -1,20 +1,21 @@
 from __future__ import annotations
 from warnings import deprecated
 from enum import Enum
-import json
+from functools import cache
 from pathlib import Path
-from typing import Any, Optional
+from types import MappingProxyType
+from typing import Any, Iterator, NamedTuple, Optional
+import numpy as np
 from pygame import constants
-from mido import MidiFile, Message, MidiTrack
 
 try:
     from .settings import NOTE_BEAT_FORGIVENESS
+    from .chart_cache import ChartTable, load_metadata, load_track
 except:
     from settings import NOTE_BEAT_FORGIVENESS
+    from chart_cache import ChartTable, load_metadata, load_track
 DEFAULT_PATH = Path("branches/")
 
-MIDIBEATLENGTH = 480
-
 
 # TODO: Perhaps Code a single Octave? (then wraparound mapping for MIDI)
 class Tone(Enum):
@@ -34,54 +35,14 @@ class Tone(Enum):
     # Tones fetched from Octave 3 on https://muted.io/note-frequencies/
     @property
     def freq(self) -> float:
-        TONEFREQUENCYMAP: dict[Tone, float] = {
-            Tone.C: 130.81,
-            Tone.CS: 138.59,
-            Tone.D: 146.83,
-            Tone.DS: 155.56,
-            Tone.E: 164.81,
-            Tone.F: 174.61,
-            Tone.FS: 185,
-            Tone.G: 196,
-            Tone.GS: 207.65,
-            Tone.A: 220,
-            Tone.AS: 233.08,
-            Tone.B: 246.94,
-        }
-        return TONEFREQUENCYMAP[self]
-
-    def toX(self, widthScale: int) -> list[int]:
-        TONEXMAP: dict[Tone, list[int]] = {
-            Tone.C: [
-                (widthScale * 0) + int(widthScale / 2),
-                (widthScale * 7) + int(widthScale / 2),
-            ],
-            Tone.CS: [(widthScale * 0) + widthScale],
-            Tone.D: [(widthScale * 1) + int(widthScale / 2)],
-            Tone.DS: [(widthScale * 1) + widthScale],
-            Tone.E: [(widthScale * 2) + int(widthScale / 2)],
-            Tone.F: [(widthScale * 3) + int(widthScale / 2)],
-            Tone.FS: [(widthScale * 3) + widthScale],
-            Tone.G: [(widthScale * 4) + int(widthScale / 2)],
-            Tone.GS: [(widthScale * 4) + widthScale],
-            Tone.A: [(widthScale * 5) + int(widthScale / 2)],
-            Tone.AS: [(widthScale * 5) + widthScale],
-            Tone.B: [(widthScale * 6) + int(widthScale / 2)],
-        }
-        return TONEXMAP[self]
+        return TONE_FREQUENCIES[self.value]
+
+    def toX(self, widthScale: int) -> tuple[int, ...]:
+        return _tone_x_table(widthScale)[self.value]
 
     @deprecated("Keyboard input no longer supported")
     def keyboard_key(self) -> Optional[int]:
-        TONEKEYBOARDMAP: dict[Tone, int] = {
-            Tone.C: constants.K_1,
-            Tone.D: constants.K_2,
-            Tone.E: constants.K_3,
-            Tone.F: constants.K_4,
-            Tone.G: constants.K_5,
-            Tone.A: constants.K_6,
-            Tone.B: constants.K_7,
-        }
-        return TONEKEYBOARDMAP[self]
+        return TONE_KEYBOARD_KEYS[self.value]
 
     def __str__(self) -> str:
         return self.name
@@ -90,55 +51,109 @@ class Tone(Enum):
     # Method can return None if key does not have mapped Keyboard Tone
     @staticmethod
     def fromKey(key: int) -> Optional[Tone]:
-        KEYBOARDTONEMAP: dict[int, Tone] = {
-            constants.K_1: Tone.C,
-            constants.K_2: Tone.D,
-            constants.K_3: Tone.E,
-            constants.K_4: Tone.F,
-            constants.K_5: Tone.G,
-            constants.K_6: Tone.A,
-            constants.K_7: Tone.B,
-            constants.K_8: Tone.C,
-            constants.K_9: Tone.D,
-            constants.K_0: Tone.E,
-        }
-        return KEYBOARDTONEMAP.get(key, None)
+        return KEYBOARD_TONES.get(key, None)
 
     @staticmethod
     def fromID(string: str) -> Tone:
-        return Tone(Tone._member_names_.index(string))
+        return Tone[string]
 
     @staticmethod
     def fromMidi(midi_key: int) -> Tone:
-        return Tone(midi_key % 12)
+        return TONES[midi_key % 12]
 
     @staticmethod
-    def keys() -> list[Tone]:
-        return [
-            Tone.C,
-            Tone.CS,
-            Tone.D,
-            Tone.DS,
-            Tone.E,
-            Tone.F,
-            Tone.FS,
-            Tone.G,
-            Tone.GS,
-            Tone.A,
-            Tone.AS,
-            Tone.B,
-        ]
+    def keys() -> tuple[Tone, ...]:
+        return TONES
 
     @staticmethod
-    def white_keys() -> list[Tone]:
-        return [Tone.C, Tone.D, Tone.E, Tone.F, Tone.G, Tone.A, Tone.B]
+    def white_keys() -> tuple[Tone, ...]:
+        return WHITE_TONES
 
     @staticmethod
-    def black_keys() -> list[Tone]:
-        return [Tone.CS, Tone.DS, Tone.FS, Tone.GS, Tone.AS]
-
+    def black_keys() -> tuple[Tone, ...]:
+        return BLACK_TONES
+
+
+# Lookup tables for Tone, indexed by Tone.value and built once at import
+# rather than on every call.
+
+# Tone by value, for turning NoteArray.tone entries back into Tones
+TONES: tuple[Tone, ...] = tuple(Tone)
+WHITE_TONES: tuple[Tone, ...] = (Tone.C, Tone.D, Tone.E, Tone.F, Tone.G, Tone.A, Tone.B)
+BLACK_TONES: tuple[Tone, ...] = (Tone.CS, Tone.DS, Tone.FS, Tone.GS, Tone.AS)
+
+TONE_FREQUENCIES: tuple[float, ...] = (
+    130.81,
+    138.59,
+    146.83,
+    155.56,
+    164.81,
+    174.61,
+    185,
+    196,
+    207.65,
+    220,
+    233.08,
+    246.94,
+)
+
+TONE_KEYBOARD_KEYS: tuple[Optional[int], ...] = (
+    constants.K_1,
+    None,
+    constants.K_2,
+    None,
+    constants.K_3,
+    constants.K_4,
+    None,
+    constants.K_5,
+    None,
+    constants.K_6,
+    None,
+    constants.K_7,
+)
+
+KEYBOARD_TONES: MappingProxyType[int, Tone] = MappingProxyType(
+    {
+        constants.K_1: Tone.C,
+        constants.K_2: Tone.D,
+        constants.K_3: Tone.E,
+        constants.K_4: Tone.F,
+        constants.K_5: Tone.G,
+        constants.K_6: Tone.A,
+        constants.K_7: Tone.B,
+        constants.K_8: Tone.C,
+        constants.K_9: Tone.D,
+        constants.K_0: Tone.E,
+    }
+)
+
+
+@cache
+def _tone_x_table(widthScale: int) -> tuple[tuple[int, ...], ...]:
+    """
+    x of every key each tone is on, for keys widthScale wide.
+    White keys are centred on their key, black keys sit on the boundary after
+    the white key they follow. C is also the key after B, an octave up.
+    """
+    half = int(widthScale / 2)
+    return (
+        ((widthScale * 0) + half, (widthScale * 7) + half),
+        ((widthScale * 0) + widthScale,),
+        ((widthScale * 1) + half,),
+        ((widthScale * 1) + widthScale,),
+        ((widthScale * 2) + half,),
+        ((widthScale * 3) + half,),
+        ((widthScale * 3) + widthScale,),
+        ((widthScale * 4) + half,),
+        ((widthScale * 4) + widthScale,),
+        ((widthScale * 5) + half,),
+        ((widthScale * 5) + widthScale,),
+        ((widthScale * 6) + half,),
+    )
 
 class NoteData:
+    __slots__ = ("time", "duration", "tone", "branch")
+
     def __init__(
         self,
         time: float,  # In terms of beats (0.5 beats is a 'quaver'), start of branch: 0
@@ -186,7 +201,124 @@ class NoteData:
         return NoteData(self.time + offset, self.duration, self.tone, self.branch)
 
 
-type Notes = list[NoteData]
+class NoteArray:
+    """
+    Struct-of-arrays note store, sorted by time. Each column is a NumPy array and
+    branch holds an index into branches. offset is added to times on read, so a
+    shifted copy of a chart shares its arrays instead of copying every note.
+    Indexing with an int gives a NoteData, with a slice or mask a NoteArray.
+    """
+
+    __slots__ = ("_time", "duration", "tone", "branch", "branches", "offset")
+
+    def __init__(
+        self,
+        time: np.ndarray,
+        duration: np.ndarray,
+        tone: np.ndarray,
+        branch: np.ndarray,
+        branches: tuple[Branch, ...],
+        offset: float = 0.0,
+    ) -> None:
+        self._time = time
+        self.duration = duration
+        self.tone = tone
+        self.branch = branch
+        self.branches = branches
+        self.offset = offset
+
+    @staticmethod
+    def empty() -> NoteArray:
+        return NoteArray(
+            np.empty(0, np.float64),
+            np.empty(0, np.float64),
+            np.empty(0, np.uint8),
+            np.empty(0, np.int16),
+            (),
+        )
+
+    @staticmethod
+    def fromTable(table: ChartTable, branch: Branch) -> NoteArray:
+        # frombuffer shares memory with the cached table rather than copying it
+        return NoteArray(
+            np.frombuffer(table.time, np.float64),
+            np.frombuffer(table.duration, np.float64),
+            np.frombuffer(table.tone, np.uint8),
+            np.zeros(len(table), np.int16),
+            (branch,),
+        )
+
+    @property
+    def time(self) -> np.ndarray:
+        if self.offset:
+            return self._time + self.offset
+        return self._time
+
+    def shifted(self, offset: float) -> NoteArray:
+        return NoteArray(
+            self._time,
+            self.duration,
+            self.tone,
+            self.branch,
+            self.branches,
+            self.offset + offset,
+        )
+
+    def __len__(self) -> int:
+        return len(self._time)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return NoteData(
+                float(self._time[index] + self.offset),
+                float(self.duration[index]),
+                TONES[self.tone[index]],
+                self.branches[self.branch[index]],
+            )
+        return NoteArray(
+            self._time[index],
+            self.duration[index],
+            self.tone[index],
+            self.branch[index],
+            self.branches,
+            self.offset,
+        )
+
+    def __iter__(self) -> Iterator[NoteData]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+type Notes = NoteArray
+
+
+class BranchTiming(NamedTuple):
+    """
+    Timing of a branch's chart in beats from the branch's start, worked out
+    once when the branch is loaded. Expects the notes sorted by start time,
+    as compiled charts are.
+    """
+
+    note_count: int
+    first_note: float  # Start of the earliest note
+    last_note: float  # Start of the latest note
+    duration: float  # Until the latest note ends
+    density: float  # Notes per beat over duration
+
+    @staticmethod
+    def of(notes: NoteArray) -> BranchTiming:
+        if not len(notes):
+            return BranchTiming(0, 0.0, 0.0, 0.0, 0.0)
+        time = notes.time
+        last = int(np.argmax(time))
+        duration = float(time[last] + notes.duration[last])
+        return BranchTiming(
+            len(notes),
+            float(time[0]),
+            float(time[last]),
+            duration,
+            len(notes) / duration if duration > 0 else 0.0,
+        )
 
 
 class Branch:
@@ -199,9 +331,9 @@ class Branch:
         self.start_time = start_time
         # Calculated from Midi Notes
         self._notes = self.loadMidi()
-        self.metadata = self.loadDict()
         # Calculated on load from Midi Contents
-        # self.duration = self.calculate
+        self.timing = BranchTiming.of(self._notes)
+        self.metadata = self.loadDict()
         # Next Branch (points to next .json file)
         self.next_branch_name: str | None = (
             self.metadata["next_branch"] if self.metadata != "None" else None
@@ -226,77 +358,29 @@ class Branch:
 
     @property
     def next_branch_ids(self) -> tuple[int, int]:
-        return (self.id * 2 - 1, self.id * 2)
+        # Each level numbers its branches from 1, the first branch (0) counts as 1
+        parent = max(self.id, 1)
+        return (parent * 2 - 1, parent * 2)
 
     def loadDict(self) -> dict[str, Any]:
-        with open(DEFAULT_PATH / "json" / f"{self.name}.json") as jsonFile:
-            data = json.load(jsonFile)
-        return data
+        return load_metadata(DEFAULT_PATH / "json" / f"{self.name}.json")
 
     def loadMidi(self) -> Notes:
-        on_off: dict[Tone, int | None] = {tone: 0 for tone in Tone}
-        notes: Notes = []
-        filepath = DEFAULT_PATH / "midi" / f"{self.name}.mid"
-        midifile = MidiFile(filepath)
-        branch: MidiTrack = midifile.tracks[self.id % len(midifile.tracks)]
-        events: list[dict[str, Any]] = [
-            event.dict()
-            for event in filter(
-                lambda m: isinstance(m, Message), [message for message in branch]
-            )
-        ]
-        current_time = 0
-        for event in events:
-            current_time += int(event["time"])
-            current_tone = Tone.fromMidi(int(event["note"]))
-            match (event["type"]):
-                case "note_on":
-                    if not on_off[current_tone]:
-                        on_off[current_tone] = current_time
-                case "note_off":
-                    if start_time := on_off[current_tone]:
-                        notes.append(
-                            NoteData(
-                                time=(start_time / MIDIBEATLENGTH),
-                                duration=(current_time - start_time) / MIDIBEATLENGTH,
-                                tone=current_tone,
-                                branch=self,
-                            )
-                        )
-                        on_off[current_tone] = None
-                    else:
-                        # Assume a mismatched note off means that the note began at the start of the midi track
-                        notes.append(
-                            NoteData(
-                                time=0,
-                                duration=(current_time) / MIDIBEATLENGTH,
-                                tone=current_tone,
-                                branch=self,
-                            )
-                        )
-        # Hacky code to remove 'whitespace'
-        # if len(notes) >= 1:
-        #     offset = notes[0].time
-        # for i in range(1, len(notes)):
-        #     notes[i].time -= offset
-        return notes
+        # Compiled once per (file, track) by chart_cache, so this is normally a lookup
+        table = load_track(DEFAULT_PATH / "midi" / f"{self.name}.mid", self.id)
+        return NoteArray.fromTable(table, self)
 
     @property
     def duration(self) -> float:
-        if not self._notes:
-            return 0.0
-        final_note = sorted(self._notes, key=lambda note: note.time, reverse=True)[0]
-        return final_note.time + final_note.duration
+        return self.timing.duration
 
     @property
     def end_time(self) -> float:
         return self.start_time + self.duration
 
     @property
-    def notes(self) -> list[NoteData]:
-        return list(
-            map(lambda note: note.applyTimeOffset(self.start_time), self._notes)
-        )
+    def notes(self) -> NoteArray:
+        return self._notes.shifted(self.start_time)
 
 
 if __name__ == "__main__":
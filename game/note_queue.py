@@ -0,0 +1,163 @@
+from __future__ import annotations
+import heapq
+from typing import Iterator
+import numpy as np
+
+try:
+    from .settings import NOTE_BEAT_FORGIVENESS
+    from .note_data import Branch, NoteArray, NoteData, Tone
+except:
+    from settings import NOTE_BEAT_FORGIVENESS
+    from note_data import Branch, NoteArray, NoteData, Tone
+
+
+class NoteStream:
+    """
+    The time-sorted notes of one branch.
+    head points at the first note that has not yet fallen past the hit window,
+    and notes hit inside the window are flagged in judged rather than removed,
+    so each frame only looks at the notes around the playhead.
+    The notes are also split into one lane per tone, each with its own head,
+    so a key press only looks at the next few notes of its own tone however
+    many other notes (chords, other branches) share the window.
+    """
+
+    __slots__ = (
+        "branch",
+        "notes",
+        "times",
+        "judged",
+        "head",
+        "remaining",
+        "lanes",
+        "lane_times",
+        "lane_heads",
+    )
+
+    def __init__(self, branch: Branch) -> None:
+        self.branch = branch
+        self.notes: NoteArray = branch.notes
+        self.times = self.notes.time
+        self.judged = np.zeros(len(self.notes), np.bool_)
+        self.head = 0
+        self.remaining = len(self.notes)
+        # Indices (and times) of each tone's notes in time order, as lists
+        # since they are read an element at a time
+        lanes = [np.flatnonzero(self.notes.tone == tone.value) for tone in Tone]
+        self.lanes: list[list[int]] = [lane.tolist() for lane in lanes]
+        self.lane_times: list[list[float]] = [
+            self.times[lane].tolist() for lane in lanes
+        ]
+        self.lane_heads = [0] * len(lanes)
+
+    def expire(self, beat_time: float) -> list[NoteData]:
+        stop = int(
+            np.searchsorted(
+                self.times, beat_time - NOTE_BEAT_FORGIVENESS, side="left"
+            )
+        )
+        if stop <= self.head:
+            return []
+        missed = [
+            self.notes[index]
+            for index in range(self.head, stop)
+            if not self.judged[index]
+        ]
+        self.remaining -= len(missed)
+        self.head = stop
+        return missed
+
+    def nearest(self, tone: Tone, beat_time: float) -> int | None:
+        """
+        Index of the unjudged note of tone closest to beat_time, if one is
+        within NOTE_BEAT_FORGIVENESS of it.
+        """
+        lane = self.lanes[tone.value]
+        lane_times = self.lane_times[tone.value]
+        position = self.lane_heads[tone.value]
+        # Judged and expired notes can never be hit, so the lane's head moves past them for good
+        while position < len(lane) and (
+            lane[position] < self.head or self.judged[lane[position]]
+        ):
+            position += 1
+        self.lane_heads[tone.value] = position
+
+        low = beat_time - NOTE_BEAT_FORGIVENESS
+        high = beat_time + NOTE_BEAT_FORGIVENESS
+        nearest = None
+        nearest_offset = 0.0
+        for position in range(position, len(lane)):
+            time = lane_times[position]
+            if time >= high:
+                break
+            if time <= low or self.judged[lane[position]]:
+                continue
+            offset = abs(time - beat_time)
+            if nearest is None or offset < nearest_offset:
+                nearest = lane[position]
+                nearest_offset = offset
+        return nearest
+
+    def judge(self, index: int) -> None:
+        if not self.judged[index]:
+            self.judged[index] = True
+            self.remaining -= 1
+
+    def __getitem__(self, index: int) -> NoteData:
+        return self.notes[index]
+
+    def __iter__(self) -> Iterator[NoteData]:
+        for index in range(self.head, len(self.notes)):
+            if not self.judged[index]:
+                yield self.notes[index]
+
+
+class NoteQueue:
+    """
+    Live notes of the song as one sorted stream per branch.
+    Branches are pushed and dropped as whole streams, so adding the next
+    pair of branches only costs their own size; iteration k-way merges the
+    streams by time.
+    """
+
+    def __init__(self, *branches: Branch) -> None:
+        self.streams: list[NoteStream] = []
+        for branch in branches:
+            self.push(branch)
+
+    def push(self, branch: Branch) -> None:
+        self.streams.append(NoteStream(branch))
+
+    def retain(self, branch: Branch) -> None:
+        """
+        Drop the streams of every branch other than branch.
+        """
+        self.streams = [stream for stream in self.streams if stream.branch is branch]
+
+    def expire(self, beat_time: float) -> list[NoteData]:
+        """
+        Move past every note that can no longer be hit and return the ones
+        that were never judged (the misses).
+        """
+        missed: list[NoteData] = []
+        for stream in self.streams:
+            missed.extend(stream.expire(beat_time))
+        return missed
+
+    def nearest(self, tone: Tone, beat_time: float) -> list[tuple[NoteStream, int]]:
+        """
+        (stream, index) of the unjudged note of tone closest to beat_time in
+        each branch, for the branches that have one within the hit window.
+        """
+        matches = []
+        for stream in self.streams:
+            index = stream.nearest(tone, beat_time)
+            if index is not None:
+                matches.append((stream, index))
+        return matches
+
+    def __len__(self) -> int:
+        return sum(stream.remaining for stream in self.streams)
+
+    def __iter__(self) -> Iterator[NoteData]:
+        return heapq.merge(*self.streams, key=lambda note: note.time)
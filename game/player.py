@@ -1,21 +1,112 @@
+import hashlib
+import logging
+import sys
+import wave
+from pathlib import Path
+
 import pygame
 
-from pathlib import Path
+from .settings import AUDIO_BUFFER, AUDIO_CACHE_DIR, AUDIO_OUTPUT_LATENCY
+
+logger = logging.getLogger(__name__)
+
 
 class Music:
+    """
+    The backing track, streamed by pygame.mixer.music from a WAV copy of its
+    decoded samples, so playing it never decodes the MP3 again. The mixer
+    counts the samples it has played, so position() follows the audio
+    device rather than the system clock.
+    """
+
     def __init__(self, file: Path):
         pygame.mixer.init()
-        pygame.mixer.music.load(file)
+        track = decoded_file(file)
+        try:
+            pygame.mixer.music.load(str(track))
+        except pygame.error as error:
+            if track == file:
+                raise
+            logger.warning(f"Could not load decoded audio {track}: {error}")
+            pygame.mixer.music.load(str(file))
         self.paused = False
+        self.latency = self.measure_latency()
+
+    @staticmethod
+    def measure_latency() -> float:
+        """
+        Time (ms) between the mixer consuming audio and it being heard: one
+        mixer buffer at the actual output rate, plus AUDIO_OUTPUT_LATENCY.
+        """
+        init = pygame.mixer.get_init()
+        if not init:
+            return float(AUDIO_OUTPUT_LATENCY)
+        frequency = init[0]
+        return AUDIO_BUFFER / frequency * 1000 + AUDIO_OUTPUT_LATENCY
 
     def play(self):
+        # Restarts from the first sample if the track is already playing
         pygame.mixer.music.play()
 
     def pause(self):
         pygame.mixer.music.pause()
 
     def stop(self):
+        pygame.mixer.music.stop()
         pygame.mixer.stop()
 
     def unpause(self):
         pygame.mixer.music.unpause()
+
+    def position(self) -> float | None:
+        """
+        Playback position (ms) of what is currently being heard, or None if
+        the track is not playing. Does not advance while paused.
+        """
+        pos = pygame.mixer.music.get_pos()
+        if pos < 0:
+            return None
+        return pos - self.latency
+
+
+def decoded_file(file: Path) -> Path:
+    """
+    A WAV file of file's samples decoded into the mixer's format, kept in
+    AUDIO_CACHE_DIR and only decoded again when file or the mixer format
+    changes. file itself if the samples cannot be saved as WAV.
+    """
+    sidecar = _sidecar_path(file)
+    if sidecar.exists():
+        return sidecar
+
+    logger.debug(f"Decoding {file}")
+    frequency, size, channels = pygame.mixer.get_init()
+    # WAV holds little-endian integer samples, other mixer formats stream
+    # the file itself
+    if size != -16 or sys.byteorder != "little":
+        return file
+    try:
+        sound = pygame.mixer.Sound(str(file))
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        temp = sidecar.with_suffix(".tmp")
+        with wave.open(str(temp), "wb") as out:
+            out.setnchannels(channels)
+            out.setsampwidth(2)
+            out.setframerate(frequency)
+            out.writeframes(sound.get_raw())
+        temp.replace(sidecar)
+    except (OSError, pygame.error) as error:
+        logger.warning(f"Could not write decoded audio {sidecar}: {error}")
+        return file
+    return sidecar
+
+
+def _sidecar_path(file: Path) -> Path:
+    # A new name whenever the source or the mixer format changes, so a stale
+    # sidecar is never loaded
+    stat = file.stat()
+    key = (
+        f"{file.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:{pygame.mixer.get_init()}"
+    )
+    digest = hashlib.sha1(key.encode()).hexdigest()[:8]
+    return Path(AUDIO_CACHE_DIR) / f"{file.stem}-{digest}.wav"
@@ -0,0 +1,144 @@
+from __future__ import annotations
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable
+
+try:
+    from .settings import PREFETCH_DEPTH
+    from .note_data import Branch
+except:
+    from settings import PREFETCH_DEPTH
+    from note_data import Branch
+
+logger = logging.getLogger(__name__)
+
+# (id, name, start_time), the arguments a Branch is built from
+type BranchKey = tuple[int, str, float]
+
+
+def child_keys(branch: Branch) -> list[BranchKey]:
+    """
+    Keys of the two branches that can follow branch, none if it ends the song.
+    A first branch without notes is followed by its own section's branches
+    instead, as its file's other tracks are where the song's notes are.
+    """
+    name = branch.next_branch_name
+    if not name:
+        if branch.id != 0 or branch.timing.note_count:
+            return []
+        name = branch.name
+    start_time = branch.end_time
+    return [(id, name, start_time) for id in branch.next_branch_ids]
+
+
+class BranchPrefetcher:
+    """
+    Builds the branches that can follow the queued ones on a worker thread,
+    depth levels ahead, so switching branch never has to load from disk.
+    hits counts branches the worker built (or was building) when asked for,
+    misses those that had to be built on the calling thread.
+    """
+
+    def __init__(self, depth: int = PREFETCH_DEPTH) -> None:
+        self.depth = depth
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending: dict[BranchKey, Future[Branch]] = {}
+        # How many levels below each pending key should be built
+        self._depths: dict[BranchKey, int] = {}
+        # Song (the key of its first branch) each pending key was built for
+        self._songs: dict[BranchKey, BranchKey] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="branch-prefetch"
+        )
+
+    def prefetch(self, branches: Iterable[Branch], song: BranchKey) -> None:
+        """
+        Start building everything below branches, depth levels deep.
+        song is the key of the first branch of the song they are from.
+        """
+        branches = list(branches)
+        if not branches:
+            return
+        horizon = min(branch.start_time for branch in branches)
+        with self._lock:
+            # Nothing of this song that starts before the queued branches can
+            # be reached any more. Other songs' branches (e.g. preloaded
+            # starts) are kept until they are played
+            passed = [
+                key
+                for key in self._pending
+                if key[2] < horizon and self._songs.get(key) == song
+            ]
+            for key in passed:
+                self._pending.pop(key).cancel()
+                self._depths.pop(key, None)
+                self._songs.pop(key, None)
+        for branch in branches:
+            self._schedule(child_keys(branch), self.depth, song)
+
+    def preload(self, keys: Iterable[BranchKey]) -> None:
+        """
+        Start building keys, the first branches of songs, and depth - 1
+        levels below them, before any branch is queued, e.g. while the
+        menus are shown.
+        """
+        for key in keys:
+            self._schedule([key], self.depth, key)
+
+    def get(self, id: int, name: str, start_time: float) -> Branch:
+        """
+        The branch for key, waiting for it if the worker is already building
+        it. Built here if it was never scheduled, failed to build or is still
+        queued, as the worker may have other songs' branches to build first.
+        """
+        key = (id, name, start_time)
+        with self._lock:
+            future = self._pending.pop(key, None)
+            self._depths.pop(key, None)
+            self._songs.pop(key, None)
+        # cancel() only succeeds if the worker has not started the build
+        if future is not None and not future.cancel():
+            try:
+                branch = future.result()
+            except Exception as error:
+                logger.warning(f"Branch prefetch failed: {key}: {error}")
+            else:
+                self.hits += 1
+                return branch
+        self.misses += 1
+        logger.debug(f"Branch prefetch miss: {key}")
+        return Branch(id, name, start_time=start_time)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self, keys: list[BranchKey], depth: int, song: BranchKey) -> None:
+        if depth <= 0:
+            return
+        for key in keys:
+            with self._lock:
+                future = self._pending.get(key)
+                if future is None:
+                    self._depths[key] = depth
+                    self._songs[key] = song
+                    self._pending[key] = self._executor.submit(self._build, key)
+                    continue
+                if self._depths.get(key, 0) >= depth:
+                    continue
+                # Already queued with a shallower depth; _build reads the new one
+                self._depths[key] = depth
+                if not future.done() or future.cancelled() or future.exception():
+                    continue
+            self._schedule(child_keys(future.result()), depth - 1, song)
+
+    def _build(self, key: BranchKey) -> Branch:
+        id, name, start_time = key
+        branch = Branch(id, name, start_time=start_time)
+        with self._lock:
+            depth = self._depths.get(key, 1)
+            song = self._songs.get(key, key)
+        self._schedule(child_keys(branch), depth - 1, song)
+        return branch
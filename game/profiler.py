@@ -0,0 +1,190 @@
+from __future__ import annotations
+import csv
+import json
+import logging
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter
+from typing import ContextManager, Iterator
+import numpy as np
+import pygame
+
+from .settings import (
+    PROFILE_DUMP_EVERY,
+    PROFILE_HISTORY,
+    PROFILE_OVERLAY_REFRESH,
+)
+from .fonts import get_font, render_text
+
+logger = logging.getLogger(__name__)
+
+_DISABLED = nullcontext()
+
+
+class FrameProfiler:
+    """
+    Times whole frames and named sections of them (update_game, each draw
+    call, display.flip, ...) over the last PROFILE_HISTORY frames.
+    When disabled, section() returns a shared no-op context, so the hooks
+    can stay in the game loop at no real cost.
+    With dump_path, the window is rewritten every PROFILE_DUMP_EVERY frames
+    as CSV or JSON depending on the file's suffix.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        dump_path: Path | None = None,
+        history: int = PROFILE_HISTORY,
+    ) -> None:
+        self.enabled = enabled
+        self.dump_path = dump_path
+        # (frame ms, {section: ms}) per frame, oldest first
+        self.frames: deque[tuple[float, dict[str, float]]] = deque(maxlen=history)
+        self.sections: list[str] = []  # Every section name seen, in first-seen order
+        self._current: dict[str, float] = {}
+        self._frame_start: float | None = None
+        self._frames_since_dump = 0
+        self._overlay: pygame.Surface | None = None
+        self._overlay_time = 0.0
+
+    def section(self, name: str) -> ContextManager[None]:
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (perf_counter() - start) * 1000
+            self._current[name] = self._current.get(name, 0.0) + elapsed
+
+    def end_frame(self) -> None:
+        """
+        Close the frame that started at the previous call.
+        """
+        if not self.enabled:
+            return
+        now = perf_counter()
+        if self._frame_start is not None:
+            for name in self._current:
+                if name not in self.sections:
+                    self.sections.append(name)
+            self.frames.append(((now - self._frame_start) * 1000, self._current))
+            self._frames_since_dump += 1
+            if self.dump_path and self._frames_since_dump >= PROFILE_DUMP_EVERY:
+                self.dump()
+        self._current = {}
+        self._frame_start = now
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Mean and percentiles (ms) of the frame time and of each section over
+        the window. A section missing from a frame counts as 0 ms there.
+        """
+        if not self.frames:
+            return {}
+        frame_ms = np.fromiter((frame for frame, _ in self.frames), float)
+        result = {"frame": _summary(frame_ms)}
+        for name in self.sections:
+            times = np.fromiter(
+                (sections.get(name, 0.0) for _, sections in self.frames), float
+            )
+            result[name] = _summary(times)
+        return result
+
+    def fps(self) -> float:
+        if not self.frames:
+            return 0.0
+        mean = sum(frame for frame, _ in self.frames) / len(self.frames)
+        return 1000 / mean if mean else 0.0
+
+    def draw_overlay(self, screen: pygame.Surface) -> pygame.Rect | None:
+        """
+        Draw the timings in the top left corner, refreshing the text every
+        PROFILE_OVERLAY_REFRESH seconds. Returns the rect drawn to.
+        """
+        if not self.enabled:
+            return None
+        now = perf_counter()
+        if self._overlay is None or now - self._overlay_time >= PROFILE_OVERLAY_REFRESH:
+            self._overlay = self._render_overlay()
+            self._overlay_time = now
+        # Opaque, so drawing it over an unchanged menu every frame is stable
+        return screen.blit(self._overlay, (0, 0))
+
+    def dump(self, path: Path | None = None) -> None:
+        path = path or self.dump_path
+        if path is None or not self.frames:
+            return
+        self._frames_since_dump = 0
+        rows = [
+            {"frame_ms": round(frame, 3)}
+            | {name: round(sections.get(name, 0.0), 3) for name in self.sections}
+            for frame, sections in self.frames
+        ]
+        temp = path.with_name(path.name + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp, "w", newline="") as out:
+                if path.suffix.lower() == ".json":
+                    json.dump({"stats": self.stats(), "frames": rows}, out, indent=1)
+                else:
+                    writer = csv.DictWriter(
+                        out, fieldnames=["frame_ms", *self.sections]
+                    )
+                    writer.writeheader()
+                    writer.writerows(rows)
+            temp.replace(path)
+        except OSError as error:
+            logger.warning(f"Could not write profile to {path}: {error}")
+            return
+        logger.debug(f"Wrote {len(rows)} frames of timings to {path}")
+
+    def _render_overlay(self) -> pygame.Surface:
+        font = get_font(12)
+        stats = self.stats()
+        lines = []
+        if "frame" in stats:
+            frame = stats["frame"]
+            lines.append(
+                f"FPS {self.fps():5.1f}   frame p50 {frame['p50']:5.2f}"
+                f"  p95 {frame['p95']:5.2f}  p99 {frame['p99']:5.2f} ms"
+            )
+        for name in self.sections:
+            section = stats[name]
+            lines.append(
+                f"{name:<20} {section['mean']:6.2f}  p95 {section['p95']:6.2f} ms"
+            )
+        if not lines:
+            lines.append("FPS   -")
+
+        rendered = [render_text(font, line, (255, 255, 255)) for line in lines]
+        width = max(text.get_width() for text in rendered) + 8
+        height = sum(text.get_height() for text in rendered) + 8
+        if self._overlay is not None:
+            # Never shrink, or menus would keep the part it no longer covers
+            width = max(width, self._overlay.get_width())
+            height = max(height, self._overlay.get_height())
+        overlay = pygame.Surface((width, height))
+        overlay.fill((20, 20, 20))
+        y = 4
+        for text in rendered:
+            overlay.blit(text, (4, y))
+            y += text.get_height()
+        return overlay
+
+
+def _summary(times: np.ndarray) -> dict[str, float]:
+    p50, p95, p99 = np.percentile(times, (50, 95, 99))
+    return {
+        "mean": float(times.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(times.max()),
+    }
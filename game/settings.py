@@ -16,16 +16,40 @@ NOTE_DISPLAY_HEIGHT = HEIGHT - PIANO_HEIGHT - (TARGET_HEIGHT * 1.5)
 # Note Settings
 NOTE_SPEED = NOTE_DISPLAY_HEIGHT / DISPLAYED_BEATS  # Height per beat
 NOTE_BEAT_FORGIVENESS = 0.2  # Allowed margin for hitting notes
+NOTE_RADIUS = 10  # Radius of a falling note head in pixels
 
 # MIDI Settings
 MIDI = True
+MIDI_POLL_INTERVAL = 0.001  # Seconds the reader thread sleeps when the device is idle
+MIDI_READ_BATCH = 1024  # Max events taken from the device per read
 
 # Music File
 MUSIC_FILE = "music/backingMain.mp3"
 
+# Audio sync
+AUDIO_BUFFER = 512  # Mixer buffer size in samples
+AUDIO_OUTPUT_LATENCY = 0  # Extra device latency (ms) on top of the buffer, for calibration
+AUDIO_SYNC_GAIN = 0.1  # Fraction of clock drift corrected each frame
+AUDIO_SYNC_SNAP = 250  # Drift (ms) beyond which the clock jumps to the audio position
+AUDIO_CACHE_DIR = "music/.cache"  # Decoded backing tracks, see player.decoded_file
+
+# Song library (see song_library.py)
+SONG_DIR = "songs"
+SONG_INDEX_FILE = "songs/.cache/index.json"
+SONGS_PER_PAGE = 7  # Songs listed on each page of the song selection screen
+
+# Compiled chart cache (see chart_cache.py)
+CHART_CACHE_DIR = "branches/.cache"
+# How many levels of the branch tree to build ahead in the background
+PREFETCH_DEPTH = 2
+
 # Score Settings
 SCORE_INCREMENT = 10
 
+# Text
+FONT_FILE = "freesansbold.ttf"
+TEXT_CACHE_SIZE = 256  # Rendered text surfaces kept (least recently used dropped)
+
 # Colors
 SCREEN_COLOR = (255, 255, 255)
 BUTTON_COLOR = (0, 255, 0)
@@ -40,10 +64,22 @@ BUTTON_X = (WIDTH_SCALE * AMOUNT_OF_NOTES - BUTTON_WIDTH) // 2
 BUTTON_Y = (HEIGHT - BUTTON_HEIGHT) // 2
 BORDER_WIDTH = 3
 
-# Graphic times
-KEY_FLASH_TIME = 30
-GHOST_FADE_TIME = 60
+# Graphic times (key flash and ghost fade in milliseconds, circle fade in beats)
+KEY_FLASH_TIME = 500
+GHOST_FADE_TIME = 1000
 CIRCLE_FADE_TIME = 3
+GHOST_POOL_SIZE = 64  # Most ghost rings shown at once, the oldest is replaced first
+
+# Timing
+FRAME_RATE = 60
+SIMULATION_RATE = 1000  # Fixed judgement ticks per second, independent of FRAME_RATE
+SIMULATION_TICK_MS = 1000 / SIMULATION_RATE
+MAX_FRAME_TIME = 250  # Longest frame (ms) the simulation will catch up on
+
+# Profiling (main.py --profile)
+PROFILE_HISTORY = 600  # Frames of timings kept, and written to the dump
+PROFILE_DUMP_EVERY = 300  # Frames between rewrites of the dump file
+PROFILE_OVERLAY_REFRESH = 0.5  # Seconds between overlay text updates
 
 # Settings Page
 ENABLE_METRONOME = False
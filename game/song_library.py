@@ -0,0 +1,220 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, NamedTuple
+
+try:
+    from .settings import BPM, SONG_DIR, SONG_INDEX_FILE
+    from .song_tree import load_song_tree
+except:
+    from settings import BPM, SONG_DIR, SONG_INDEX_FILE
+    from song_tree import load_song_tree
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VERSION = 3  # 3: lengths at BPM, no bpm or music
+
+# (mtime in ns, size) of a file, None if it is missing
+type Stamp = tuple[int, int] | None
+
+
+class SongEntry(NamedTuple):
+    """
+    What the song selection screen needs to know about a song, without
+    loading any of its charts. duration is in seconds on the longest path
+    through its branches, at the BPM every song is played at.
+    """
+
+    key: str  # Name of its file in SONG_DIR, without .json
+    title: str
+    first_branch: str
+    duration: float
+    branch_count: int
+    # Every file the entry was built from (song and branches)
+    sources: dict[str, Stamp]
+
+    def is_current(self, stamps: dict[str, Stamp]) -> bool:
+        return all(
+            _stamp(path, stamps) == stamp for path, stamp in self.sources.items()
+        )
+
+
+class SongLibrary:
+    """
+    Every song in SONG_DIR, indexed in SONG_INDEX_FILE so later scans only
+    re-read songs whose song file or branch files changed.
+
+    A song is a JSON file with the song's "name" and its "first_branch".
+    Every song is played at BPM over MUSIC_FILE, so a song's own "bpm" and
+    "music" are not read yet. Files without a first_branch (e.g. a
+    written-out melody) are not playable and are left out, as are songs
+    whose branches have no notes.
+    """
+
+    def __init__(
+        self, folder: Path = Path(SONG_DIR), index_file: Path = Path(SONG_INDEX_FILE)
+    ) -> None:
+        self.folder = folder
+        self.index_file = index_file
+        # Sorted by title, replaced as a whole so other threads can read it
+        self.songs: tuple[SongEntry, ...] = ()
+        # Goes up every time songs changes, for screens built from it
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def scan(self) -> tuple[SongEntry, ...]:
+        """
+        Bring the library up to date with the files on disk and save the
+        index if anything changed.
+        """
+        with self._lock:
+            indexed, skipped = self._read_index()
+            # Songs made of the same branches share their stamps
+            stamps: dict[str, Stamp] = {}
+            songs: dict[str, SongEntry] = {}
+            not_songs: dict[str, Stamp] = {}
+            rebuilt = 0
+            try:
+                items = list(os.scandir(self.folder))
+            except OSError as error:
+                logger.warning(f"Could not list songs in {self.folder}: {error}")
+                items = []
+            for item in items:
+                if not item.name.endswith(".json") or not item.is_file():
+                    continue
+                key = item.name.removesuffix(".json")
+                stat = item.stat()
+                stamp = stamps[item.path] = (stat.st_mtime_ns, stat.st_size)
+                entry = indexed.get(key)
+                if entry is not None and entry.is_current(stamps):
+                    songs[key] = entry
+                    continue
+                if key in skipped and skipped[key] == stamp:
+                    not_songs[key] = stamp
+                    continue
+                rebuilt += 1
+                try:
+                    entry = self._index_song(Path(item.path), stamps)
+                except (OSError, ValueError) as error:
+                    # Not recorded as skipped, so it is tried again next scan
+                    logger.warning(f"Could not load song {item.path}: {error}")
+                    continue
+                if entry is None:
+                    not_songs[key] = stamp
+                else:
+                    songs[key] = entry
+
+            changed = rebuilt or songs.keys() != indexed.keys()
+            if changed or not_songs.keys() != skipped.keys():
+                self._write_index(songs, not_songs)
+            if changed or not self.generation:
+                self.songs = tuple(
+                    sorted(
+                        songs.values(),
+                        key=lambda song: (song.title.casefold(), song.key),
+                    )
+                )
+                self.generation += 1
+            logger.debug(f"Song library: {len(songs)} songs, {rebuilt} files re-read")
+            return self.songs
+
+    def get(self, key: str) -> SongEntry | None:
+        for song in self.songs:
+            if song.key == key:
+                return song
+        return None
+
+    def _index_song(self, path: Path, stamps: dict[str, Stamp]) -> SongEntry | None:
+        """
+        Entry for the song file at path, None if it is not a playable song.
+        Raises OSError or ValueError if it or its branches cannot be read,
+        or they have no notes to play.
+        """
+        with open(path) as song_file:
+            data = json.load(song_file)
+        first_branch = data.get("first_branch") if isinstance(data, dict) else None
+        if not first_branch:
+            logger.debug(f"{path} has no first_branch, not listed")
+            return None
+        # The same tree the game plays, so it is only compiled once
+        tree = load_song_tree(first_branch)
+        if not tree.root.most_notes:
+            raise ValueError(f"No notes on any path from branch {first_branch}")
+
+        sources = {str(path): _stamp(str(path), stamps)}
+        for source, stamp in tree.sources.items():
+            stamps[str(source)] = stamp
+            sources[str(source)] = stamp
+        return SongEntry(
+            key=path.stem,
+            title=data.get("name", path.stem),
+            first_branch=first_branch,
+            duration=tree.root.latest_end * 60 / BPM,
+            branch_count=len(tree.nodes),
+            sources=sources,
+        )
+
+    def _read_index(self) -> tuple[dict[str, SongEntry], dict[str, Stamp]]:
+        try:
+            with open(self.index_file) as index_file:
+                index = json.load(index_file)
+            if index.get("version") != _INDEX_VERSION:
+                return {}, {}
+            songs = {
+                key: _entry_from_dict(key, song) for key, song in index["songs"].items()
+            }
+            skipped = {
+                key: _stamp_from_json(stamp) for key, stamp in index["skipped"].items()
+            }
+            return songs, skipped
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or unreadable, everything is scanned again
+            return {}, {}
+
+    def _write_index(
+        self, songs: dict[str, SongEntry], skipped: dict[str, Stamp]
+    ) -> None:
+        index = {
+            "version": _INDEX_VERSION,
+            "songs": {key: _entry_to_dict(song) for key, song in songs.items()},
+            "skipped": skipped,
+        }
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.index_file.with_suffix(".tmp")
+            with open(temp, "w") as out:
+                json.dump(index, out)
+            temp.replace(self.index_file)
+        except OSError as error:
+            # The scan still stands, it is just not saved for the next launch
+            logger.warning(f"Could not write song index {self.index_file}: {error}")
+
+
+def _entry_to_dict(song: SongEntry) -> dict[str, Any]:
+    fields = song._asdict()
+    del fields["key"]
+    return fields
+
+
+def _entry_from_dict(key: str, fields: dict[str, Any]) -> SongEntry:
+    sources = {
+        path: _stamp_from_json(stamp) for path, stamp in fields["sources"].items()
+    }
+    return SongEntry(key=key, **(fields | {"sources": sources}))
+
+
+def _stamp_from_json(stamp: list[int] | None) -> Stamp:
+    return tuple(stamp) if stamp is not None else None
+
+
+def _stamp(path: str, stamps: dict[str, Stamp]) -> Stamp:
+    if path not in stamps:
+        try:
+            stat = Path(path).stat()
+            stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamps[path] = None
+    return stamps[path]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+import logging
+import threading
+from pathlib import Path
+
+try:
+    from .note_data import DEFAULT_PATH, Branch, BranchTiming
+    from .prefetch import BranchKey, child_keys
+except:
+    from note_data import DEFAULT_PATH, Branch, BranchTiming
+    from prefetch import BranchKey, child_keys
+
+logger = logging.getLogger(__name__)
+
+SONG_START = 4  # Beat the first branch of every song starts on
+
+
+class BranchNode:
+    """
+    Timing of one branch in a song's tree, without its notes. timing is the
+    branch's own, relative to start_time.
+    latest_end and earliest_end are when (in beats) the song ends on the
+    longest and shortest paths through this branch, and most_notes is the
+    number of notes on the fullest path from its start to the song's end.
+    """
+
+    __slots__ = (
+        "key",
+        "start_time",
+        "end_time",
+        "timing",
+        "children",
+        "latest_end",
+        "earliest_end",
+        "most_notes",
+    )
+
+    def __init__(self, branch: Branch, children: list[BranchKey]) -> None:
+        self.key: BranchKey = (branch.id, branch.name, branch.start_time)
+        self.start_time = branch.start_time
+        self.end_time = branch.end_time
+        self.timing: BranchTiming = branch.timing
+        self.children = tuple(children)
+        self.latest_end = self.end_time
+        self.earliest_end = self.end_time
+        self.most_notes = self.timing.note_count
+
+
+class SongTree:
+    """
+    Every branch a song can play, compiled once by following the next_branch
+    chain from its first branch. Each branch is followed by two children
+    (see Branch.next_branch_ids) until a section with no next_branch ends
+    the song, or follows an empty first branch once (see child_keys).
+    """
+
+    def __init__(self, song: str) -> None:
+        self.song = song
+        self.nodes: dict[BranchKey, BranchNode] = {}
+        # Every file the tree was built from, with the (mtime, size) it had
+        self.sources: dict[Path, tuple[int, int]] = {}
+
+        names = []
+        level = [(0, song, SONG_START)]
+        while level:
+            name = level[0][1]
+            # Only the first branch's own section may come round again
+            repeat = len(self.nodes) == 1 and not self.root.timing.note_count
+            if name in names and not repeat:
+                raise ValueError(f"Song {song} loops back to section {name}")
+            if name not in names:
+                names.append(name)
+            next_level = []
+            for key in level:
+                branch = Branch(*key)
+                children = child_keys(branch)
+                self.nodes[key] = BranchNode(branch, children)
+                next_level.extend(children)
+            level = next_level
+
+        # Children were added after their parents, so in reverse every
+        # child's totals are ready before its parent needs them
+        for node in reversed(self.nodes.values()):
+            if not node.children:
+                continue
+            children = [self.nodes[key] for key in node.children]
+            node.latest_end = max(child.latest_end for child in children)
+            node.earliest_end = min(child.earliest_end for child in children)
+            node.most_notes = node.timing.note_count + max(
+                child.most_notes for child in children
+            )
+
+        for name in names:
+            for path in (
+                DEFAULT_PATH / "json" / f"{name}.json",
+                DEFAULT_PATH / "midi" / f"{name}.mid",
+            ):
+                self.sources[path] = _stamp(path)
+        logger.debug(
+            f"Compiled song {song}: {len(names)} sections, {len(self.nodes)} branches"
+        )
+
+    @property
+    def root(self) -> BranchNode:
+        return self.nodes[(0, self.song, SONG_START)]
+
+    def node(self, branch: Branch) -> BranchNode:
+        return self.nodes[(branch.id, branch.name, branch.start_time)]
+
+    def is_current(self) -> bool:
+        """
+        False once any file the tree was built from has changed.
+        """
+        try:
+            return all(_stamp(path) == stamp for path, stamp in self.sources.items())
+        except OSError:
+            return False
+
+
+_trees: dict[str, SongTree] = {}
+# Trees are also compiled on the startup thread
+_lock = threading.Lock()
+
+
+def load_song_tree(song: str) -> SongTree:
+    """
+    Return the compiled tree of song, compiling it only the first time or
+    after one of its files has changed.
+    """
+    with _lock:
+        tree = _trees.get(song)
+        if tree is None or not tree.is_current():
+            tree = SongTree(song)
+            _trees[song] = tree
+        return tree
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
@@ -1,5 +1,6 @@
 import pygame
 import logging
+import numpy as np
 
 from .settings import (
     AMOUNT_OF_NOTES,
@@ -8,132 +9,250 @@ from .settings import (
     WIDTH_SCALE,
     NOTE_SPEED,
     NOTE_DISPLAY_HEIGHT,
+    NOTE_RADIUS,
     GHOST_FADE_TIME,
     CIRCLE_FADE_TIME,
 )
-from .note_data import NoteData
-from .note_data import Tone
+from .note_data import TONES, Tone
+from .note_queue import NoteQueue
+from .ghosts import GhostPool
+from .fonts import get_font, render_text
 
 logger = logging.getLogger(__name__)
 
 WHITE_KEYS = Tone.white_keys()
 BLACK_KEYS = Tone.black_keys()
 
+# x of each tone's note lane (the first key it is on), indexed by Tone value
+_NOTE_X = np.array([tone.toX(widthScale=WIDTH_SCALE)[0] for tone in TONES], np.intp)
 
-def drawPiano(
-    screen,
-    width,
-    height,
-    pressed_keys,
-    font,
-    piano_height,
-    key_feedback=None,
-):
-    line_width = 3
-    key_width = width // AMOUNT_OF_NOTES
-    black_key_width = key_width // 2
-    white_key_height = piano_height
-    black_key_height = int(piano_height * 0.6)
-    white_base_y = height - piano_height
-    black_base_y = height - piano_height
-
-    white_key_labels = {
-        k.name: font.render(k.name, True, (0, 0, 0)) for k in WHITE_KEYS
-    }
-    small_font = pygame.font.Font("freesansbold.ttf", 16)
-    black_key_labels = {
-        k.name.replace("S", "#"): small_font.render(
-            k.name.replace("S", "#"), True, (255, 255, 255)
-        )
-        for k in BLACK_KEYS
-    }
 
-    # WHITE KEYS
-    for index, x in enumerate(range(0, width, key_width)):
-        tone = WHITE_KEYS[index % 7]
-        feedback, _ = key_feedback[tone] if key_feedback else (None, 0)
-
-        # Color logic
-        if feedback == "hit":
-            key_color = (0, 255, 0)
-        elif feedback == "miss":
-            key_color = (255, 0, 0)
-        elif pressed_keys[tone]:
-            key_color = (0, 120, 215)
-        else:
-            key_color = (255, 255, 255)
+# Pre-rendered static parts of the gameplay screen, keyed by everything they are drawn from.
+# Anything drawn from settings that can change at runtime must call clear_static_cache().
+_static_layers: dict[tuple, pygame.Surface] = {}
 
-        pygame.draw.rect(
-            screen, key_color, (x, white_base_y, key_width, white_key_height)
-        )
-        if x != 0:
-            pygame.draw.line(
-                screen, (0, 0, 0), (x, white_base_y), (x, height), line_width
-            )
 
-        # White key label
-        label_surf = white_key_labels[tone.name]
-        label_rect = label_surf.get_rect(
-            center=(x + key_width // 2, white_base_y + white_key_height * 0.8)
-        )
-        screen.blit(label_surf, label_rect)
+def clear_static_cache() -> None:
+    _static_layers.clear()
+
+
+def _new_layer(size, alpha: bool = False) -> pygame.Surface:
+    if alpha:
+        layer = pygame.Surface(size, pygame.SRCALPHA)
+        return layer.convert_alpha() if pygame.display.get_surface() else layer
+    layer = pygame.Surface(size)
+    return layer.convert() if pygame.display.get_surface() else layer
+
+
+def _cached_layer(key: tuple, render) -> pygame.Surface:
+    layer = _static_layers.get(key)
+    if layer is None:
+        layer = render()
+        _static_layers[key] = layer
+    return layer
+
+
+def _key_colour(tone, pressed_keys, key_feedback, idle_colour):
+    feedback, _ = key_feedback[tone] if key_feedback else (None, 0)
+    if feedback == "hit":
+        return (0, 255, 0)
+    elif feedback == "miss":
+        return (255, 0, 0)
+    elif pressed_keys.get(tone, False):
+        return (0, 120, 215)
+    return idle_colour
+
 
-    # BLACK KEYS
+def _piano_labels(font):
+    small_font = get_font(16)
+    labels = {k: render_text(font, k.name, (0, 0, 0)) for k in WHITE_KEYS}
+    for k in BLACK_KEYS:
+        labels[k] = render_text(small_font, k.name.replace("S", "#"), (255, 255, 255))
+    return labels
+
+
+def _piano_keys(width, piano_height):
+    """
+    (tone, x) of each white key and black key.
+    """
+    key_width = width // AMOUNT_OF_NOTES
+    white_keys = []
+    black_keys = []
     for index, x in enumerate(range(0, width, key_width)):
         tone = WHITE_KEYS[index % 7]
+        white_keys.append((tone, x))
         # If E or B, skip drawing a black key
-        if tone in (Tone.E, Tone.B):
-            continue
+        if tone not in (Tone.E, Tone.B):
+            black_keys.append((TONES[(tone.value + 1) % 12], x + int(key_width * 0.75)))
+    return white_keys, black_keys
+
+
+def _draw_white_key(
+    screen, x, key_width, white_base_y, height, piano_height, colour, label, line_width
+):
+    pygame.draw.rect(screen, colour, (x, white_base_y, key_width, piano_height))
+    for line_x in (x, x + key_width):
+        if line_x != 0:
+            pygame.draw.line(
+                screen, (0, 0, 0), (line_x, white_base_y), (line_x, height), line_width
+            )
 
-        black_x = x + int(key_width * 0.75)
+    # White key label
+    label_rect = label.get_rect(
+        center=(x + key_width // 2, white_base_y + piano_height * 0.8)
+    )
+    screen.blit(label, label_rect)
 
-        black_tone_value = (tone.value + 1) % 12
-        black_tone = Tone(black_tone_value)
 
-        feedback, _ = key_feedback[black_tone] if key_feedback else (None, 0)
-        if feedback == "hit":
-            black_color = (0, 255, 0)
-        elif feedback == "miss":
-            black_color = (255, 0, 0)
-        elif pressed_keys.get(black_tone, False):
-            black_color = (0, 120, 215)
-        else:
-            black_color = (0, 0, 0)
+def _draw_black_key(
+    screen,
+    black_x,
+    black_key_width,
+    black_base_y,
+    black_key_height,
+    colour,
+    label,
+    line_width,
+):
+    # Draw the black key with an outline
+    outline_rect = pygame.Rect(black_x, black_base_y, black_key_width, black_key_height)
+    pygame.draw.rect(screen, (0, 0, 0), outline_rect)  # Black outline
+    inner_rect = outline_rect.inflate(
+        -line_width * 2, -line_width * 2
+    )  # Actual key rectangle
+    pygame.draw.rect(screen, colour, inner_rect)
+
+    # Black key label
+    label_rect = label.get_rect(
+        center=(
+            black_x + black_key_width // 2,
+            black_base_y + black_key_height - 15,
+        )
+    )
+    screen.blit(label, label_rect)
 
-        # Draw the black key with an outline
-        outline_rect = pygame.Rect(
-            black_x, black_base_y, black_key_width, black_key_height
+
+def _render_piano(width, height, piano_height, font, top):
+    """
+    The target bands and the piano with no keys pressed, from y=top down.
+    """
+    line_width = 3
+    key_width = width // AMOUNT_OF_NOTES
+    white_base_y = height - piano_height
+    labels = _piano_labels(font)
+    white_keys, black_keys = _piano_keys(width, piano_height)
+
+    layer = _new_layer((width, height - top))
+    # Draw as if on the screen, then shift up
+    canvas = pygame.Surface((width, height))
+    canvas.fill((255, 255, 255))
+    for tone, x in white_keys:
+        _draw_white_key(
+            canvas,
+            x,
+            key_width,
+            white_base_y,
+            height,
+            piano_height,
+            (255, 255, 255),
+            labels[tone],
+            line_width,
         )
-        pygame.draw.rect(screen, (0, 0, 0), outline_rect)  # Black outline
-        inner_rect = outline_rect.inflate(
-            -line_width * 2, -line_width * 2
-        )  # Actual key rectangle
-        pygame.draw.rect(screen, black_color, inner_rect)
-
-        # Black key label
-        label_surf = black_key_labels[black_tone.name.replace("S", "#")]
-        label_rect = label_surf.get_rect(
-            center=(
-                black_x + black_key_width // 2,
-                black_base_y + black_key_height - 15,
-            )
+    for tone, black_x in black_keys:
+        _draw_black_key(
+            canvas,
+            black_x,
+            key_width // 2,
+            white_base_y,
+            int(piano_height * 0.6),
+            (0, 0, 0),
+            labels[tone],
+            line_width,
         )
-        screen.blit(label_surf, label_rect)
-
-    pygame.draw.line(
-        screen, (0, 0, 0), (width, white_base_y), (width, height), line_width
-    )
     for i, color in enumerate([(255, 0, 0), (0, 255, 0)]):
         pygame.draw.rect(
-            screen, color, (0, white_base_y - (i + 1) * 50, width, TARGET_HEIGHT)
+            canvas, color, (0, white_base_y - (i + 1) * 50, width, TARGET_HEIGHT)
         )
         pygame.draw.line(
-            screen,
+            canvas,
             (0, 0, 0),
             (0, white_base_y - (i + 1) * 50),
             (width, white_base_y - (i + 1) * 50),
             line_width,
         )
+    pygame.draw.line(
+        canvas, (0, 0, 0), (0, white_base_y), (width, white_base_y), line_width
+    )
+    layer.blit(canvas, (0, -top))
+    return layer, labels
+
+
+def drawPiano(
+    screen,
+    width,
+    height,
+    pressed_keys,
+    font,
+    piano_height,
+    key_feedback=None,
+):
+    """
+    Blit the cached idle piano and target bands, then redraw only the keys
+    that are pressed or showing hit/miss feedback.
+    """
+    line_width = 3
+    key_width = width // AMOUNT_OF_NOTES
+    white_base_y = height - piano_height
+    # Top of the highest target band, including its outline
+    top = white_base_y - 2 * 50 - line_width // 2
+
+    key = ("piano", width, height, piano_height, font)
+    cached = _static_layers.get(key)
+    if cached is None:
+        cached = _render_piano(width, height, piano_height, font, top)
+        _static_layers[key] = cached
+    layer, labels = cached
+    screen.blit(layer, (0, top))
+
+    white_keys, black_keys = _piano_keys(width, piano_height)
+    white_colours = [
+        _key_colour(tone, pressed_keys, key_feedback, (255, 255, 255))
+        for tone, _ in white_keys
+    ]
+    black_colours = [
+        _key_colour(tone, pressed_keys, key_feedback, (0, 0, 0))
+        for tone, _ in black_keys
+    ]
+    any_white = any(colour != (255, 255, 255) for colour in white_colours)
+    if not any_white and all(colour == (0, 0, 0) for colour in black_colours):
+        return
+
+    for (tone, x), colour in zip(white_keys, white_colours):
+        if colour != (255, 255, 255):
+            _draw_white_key(
+                screen,
+                x,
+                key_width,
+                white_base_y,
+                height,
+                piano_height,
+                colour,
+                labels[tone],
+                line_width,
+            )
+    # Black keys sit on top of the white ones, so redraw them all if a white key changed
+    for (tone, black_x), colour in zip(black_keys, black_colours):
+        if any_white or colour != (0, 0, 0):
+            _draw_black_key(
+                screen,
+                black_x,
+                key_width // 2,
+                white_base_y,
+                int(piano_height * 0.6),
+                colour,
+                labels[tone],
+                line_width,
+            )
     pygame.draw.line(
         screen, (0, 0, 0), (0, white_base_y), (width, white_base_y), line_width
     )
@@ -177,73 +296,166 @@ def drawHealth(screen, health_bar_width, health, max_health) -> None:
 
 
 def labelsForNotes(screen, width: int, height: int, font) -> None:
-    key_width = width // AMOUNT_OF_NOTES
-    offset = 520
-    note_names = ["C", "D", "E", "F", "G", "A", "B", "C", "D", "E", "F", "G"]
-    for index, note in enumerate(note_names):
-        note_text = font.render(note, True, (0, 0, 0))
-        text_rect = note_text.get_rect(
-            center=(index * key_width + key_width // 2, height - offset)
-        )
-        screen.blit(note_text, text_rect)
+    def render():
+        key_width = width // AMOUNT_OF_NOTES
+        offset = 520
+        note_names = ["C", "D", "E", "F", "G", "A", "B", "C", "D", "E", "F", "G"]
+        labels = []
+        for index, note in enumerate(note_names):
+            note_text = render_text(font, note, (0, 0, 0))
+            text_rect = note_text.get_rect(
+                center=(index * key_width + key_width // 2, height - offset)
+            )
+            labels.append((note_text, text_rect))
+        # One transparent strip just big enough for all the labels
+        bounds = labels[0][1].unionall([rect for _, rect in labels])
+        layer = _new_layer(bounds.size, alpha=True)
+        for note_text, text_rect in labels:
+            layer.blit(note_text, text_rect.move(-bounds.x, -bounds.y))
+        return layer, bounds.topleft
 
+    layer, position = _cached_layer(("labels", width, height, font), render)
+    screen.blit(layer, position)
 
-def drawScale(screen, width: int, height: int) -> None:
-    colour = (255, 255, 255)
-    key_width = width // AMOUNT_OF_NOTES
-    for x in range(0, width, key_width):
-        pygame.draw.rect(screen, colour, (x, 0, key_width, height))
-        pygame.draw.line(screen, (0, 0, 0), (x, 0), (x, height), 1)
-        colour = (212, 212, 212) if colour == (255, 255, 255) else (255, 255, 255)
 
+def drawScale(screen, width: int, height: int) -> None:
+    def render():
+        layer = _new_layer((width, height))
+        colour = (255, 255, 255)
+        key_width = width // AMOUNT_OF_NOTES
+        for x in range(0, width, key_width):
+            pygame.draw.rect(layer, colour, (x, 0, key_width, height))
+            pygame.draw.line(layer, (0, 0, 0), (x, 0), (x, height), 1)
+            colour = (212, 212, 212) if colour == (255, 255, 255) else (255, 255, 255)
+        return layer
+
+    screen.blit(_cached_layer(("scale", width, height), render), (0, 0))
+
+
+def _note_sprite(colour) -> pygame.Surface:
+    def render():
+        size = NOTE_RADIUS * 2 + 2
+        sprite = _new_layer((size, size), alpha=True)
+        sprite.fill((0, 0, 0, 0))
+        pygame.draw.circle(
+            sprite, colour, (NOTE_RADIUS + 1, NOTE_RADIUS + 1), NOTE_RADIUS
+        )
+        return sprite
 
-def drawNote(screen, note: NoteData, beat_time: float) -> None:
-    note_x_list = note.tone.toX(widthScale=WIDTH_SCALE)
-    note_y = beatsToY(note.time, beat_time)
-    pygame.draw.circle(screen, note.colour, (note_x_list[0], note_y), 10)
+    return _cached_layer(("note", colour), render)
 
 
-def draw_ghosts(screen, ghosts):
+def drawNotes(screen, notes: NoteQueue, beat_time: float) -> None:
     """
-    Draws each ghost note as a ring at the point of it being hit.
-    ghosts is a list of dicts: {tone, color, frames_left, y_position}.
+    Draws every unjudged note that is on screen as its branch's note sprite.
+    Positions are worked out per branch with NumPy over only the notes whose
+    time puts them inside the screen, so the cost follows the number of
+    visible notes rather than the length of the chart.
     """
-    for ghost in ghosts:
-        tone = ghost["tone"]
-        color = ghost["color"]
-        frames_left = ghost["frames_left"]
-        ghost_y = ghost["y_position"]
-
-        # Calculate opacity, radius and thickness, which face over time
-        alpha = int(128 * (frames_left / GHOST_FADE_TIME))  # 50% opacity
-        radius = int(10 + (30 - 10) * (1 - frames_left / GHOST_FADE_TIME))
-        thickness = max(1, int(5 - 4 * (1 - frames_left / GHOST_FADE_TIME)))
-
-        # Get x-coordinate of the tone
-        note_x_list = tone.toX(widthScale=WIDTH_SCALE)
-
-        # Draw ghost
-        for x in note_x_list:
-            # Create trans surface
-            surface_size = (radius + 3) * 2  # Radius + circle thickness
-            ghost_surface = pygame.Surface(
-                (surface_size, surface_size), pygame.SRCALPHA
-            )
-            pygame.draw.circle(
-                ghost_surface,
-                (*color, alpha),
-                (surface_size // 2, surface_size // 2),
-                radius,
-                thickness,
+    # Beats before / after beat_time at which a note head leaves the screen
+    margin = NOTE_RADIUS + 1
+    past = (screen.get_height() - NOTE_DISPLAY_HEIGHT + margin) / NOTE_SPEED
+    ahead = (NOTE_DISPLAY_HEIGHT + margin) / NOTE_SPEED
+
+    times, xs, sprite_ids, sprites = [], [], [], []
+    for stream in notes.streams:
+        start = int(np.searchsorted(stream.times, beat_time - past, side="left"))
+        start = max(start, stream.head)
+        stop = int(np.searchsorted(stream.times, beat_time + ahead, side="right"))
+        if start >= stop:
+            continue
+        visible = start + np.flatnonzero(~stream.judged[start:stop])
+        times.append(stream.times[visible])
+        xs.append(_NOTE_X[stream.notes.tone[visible]])
+        sprite_ids.append(np.full(len(visible), len(sprites)))
+        sprites.append(_note_sprite(stream.branch.colour))
+    if not times:
+        return
+
+    # Same order as iterating the queue: by time, earlier branches first on ties
+    time = np.concatenate(times)
+    order = np.argsort(time, kind="stable")
+    # beatsToY, truncated towards zero like pygame.draw.circle does
+    ys = (NOTE_SPEED * (beat_time - time[order]) + NOTE_DISPLAY_HEIGHT).astype(np.intp)
+    lefts = np.concatenate(xs)[order] - margin
+    tops = ys - margin
+    screen.blits(
+        [
+            (sprites[sprite], (left, top))
+            for sprite, left, top in zip(
+                np.concatenate(sprite_ids)[order].tolist(),
+                lefts.tolist(),
+                tops.tolist(),
             )
+        ],
+        doreturn=False,
+    )
 
-            screen.blit(
-                ghost_surface, (x - surface_size // 2, ghost_y - surface_size // 2)
-            )
+
+def _ghost_look(time_left: float) -> tuple[int, int, int]:
+    """
+    (alpha, radius, thickness) of a ghost ring with time_left ms to live.
+    """
+    fade = time_left / GHOST_FADE_TIME
+    alpha = int(128 * fade)  # 50% opacity
+    radius = int(10 + (30 - 10) * (1 - fade))
+    thickness = max(1, int(5 - 4 * (1 - fade)))
+    return alpha, radius, thickness
+
+
+def _ghost_frames() -> tuple[list[int], list[tuple[int, int, int]]]:
+    # Many ms of the fade look the same, so the sheet only holds distinct frames
+    looks: list[tuple[int, int, int]] = []
+    frame_of: list[int] = []
+    for time_left in range(GHOST_FADE_TIME + 1):
+        look = _ghost_look(time_left)
+        if not looks or looks[-1] != look:
+            looks.append(look)
+        frame_of.append(len(looks) - 1)
+    return frame_of, looks
+
+
+# Sheet frame for each whole ms of time left, and the frame's rect on the sheet
+_GHOST_FRAME_OF, _GHOST_LOOKS = _ghost_frames()
+_GHOST_CELL = (30 + 3) * 2  # Largest ring: radius + circle thickness
+_GHOST_AREAS = [
+    pygame.Rect(frame * _GHOST_CELL, 0, (radius + 3) * 2, (radius + 3) * 2)
+    for frame, (_, radius, _) in enumerate(_GHOST_LOOKS)
+]
+
+
+def _ghost_sheet(colour) -> pygame.Surface:
+    """
+    Every frame of the ghost ring fade in colour, side by side on one surface.
+    """
+
+    def render():
+        sheet = _new_layer((_GHOST_CELL * len(_GHOST_LOOKS), _GHOST_CELL), alpha=True)
+        sheet.fill((0, 0, 0, 0))
+        for area, (alpha, radius, thickness) in zip(_GHOST_AREAS, _GHOST_LOOKS):
+            pygame.draw.circle(sheet, (*colour, alpha), area.center, radius, thickness)
+        return sheet
+
+    return _cached_layer(("ghosts", colour), render)
+
+
+def draw_ghosts(screen, ghosts: GhostPool) -> None:
+    """
+    Draws each ghost note as a ring at the point of it being hit, fading out
+    and growing over GHOST_FADE_TIME, by blitting its frame off the sprite sheet.
+    """
+    blits = []
+    for tone, colour, time_left, ghost_y in ghosts:
+        area = _GHOST_AREAS[_GHOST_FRAME_OF[min(int(time_left), GHOST_FADE_TIME)]]
+        half = area.width // 2
+        sheet = _ghost_sheet(colour)
+        for x in tone.toX(widthScale=WIDTH_SCALE):
+            blits.append((sheet, (x - half, ghost_y - half), area))
+    screen.blits(blits, doreturn=False)
 
 
 def drawTime(screen, time: float, font) -> None:
-    note_text = font.render(f"{int(time)}", True, (0, 0, 0))
+    note_text = render_text(font, f"{int(time)}", (0, 0, 0))
     text_rect = note_text.get_rect(center=(100, 100))
     screen.blit(note_text, text_rect)
 
@@ -260,6 +472,144 @@ def beatsToY(target_beat: float, beat_time: float) -> float:
     return NOTE_SPEED * (beat_time - target_beat) + NOTE_DISPLAY_HEIGHT
 
 
+# The progress bar layer, as (key, layer). Only the latest one is kept, and
+# it is extended in place while segments are only being added to it.
+_progress_layer: tuple[tuple, pygame.Surface] | None = None
+
+
+def _progress_base(
+    width: int,
+    total_time: float,
+    closed: tuple[tuple[float, float, tuple[int, int, int]], ...],
+    live_color: tuple[int, int, int] | None,
+) -> pygame.Surface:
+    """
+    The progress bar's outline and background with the closed segments (and
+    the blend from each into the next) drawn in.
+    """
+    global _progress_layer
+    bar_height = 15
+    barIndent = 30
+    bar_width = width - barIndent
+    borderWidth = 3
+    # Drawn relative to the top left of the outline
+    x, y = float(borderWidth), float(borderWidth)
+
+    key = (width, total_time, closed, live_color)
+    if _progress_layer is not None:
+        old_key, layer = _progress_layer
+        if old_key == key:
+            return layer
+        old_width, old_total, old_closed, _ = old_key
+        extends = (
+            old_width == width
+            and old_total == total_time
+            and closed[: len(old_closed)] == old_closed
+        )
+    else:
+        extends, old_closed = False, ()
+
+    if not extends:
+        old_closed = ()
+        layer = _new_layer((bar_width + borderWidth * 2, bar_height + borderWidth * 2))
+        pygame.draw.rect(layer, (0, 0, 0), layer.get_rect(), borderWidth * 2)
+        pygame.draw.rect(layer, (200, 200, 200), (x, y, bar_width, bar_height))
+
+    # Segments only ever paint between their own start and end, so new ones
+    # can be drawn over the old layer
+    next_colors = [color for _, _, color in closed[1:]] + [live_color]
+    for i in range(len(old_closed), len(closed)):
+        seg_start, seg_end, seg_color = closed[i]
+        _draw_segment(
+            layer,
+            x,
+            y,
+            bar_width,
+            bar_height,
+            total_time,
+            seg_start,
+            seg_end,
+            seg_color,
+            next_colors[i],
+        )
+    _progress_layer = (key, layer)
+    return layer
+
+
+def _draw_segment(
+    surface: pygame.Surface,
+    bar_x: float,
+    bar_y: float,
+    bar_width: int,
+    bar_height: int,
+    total_time: float,
+    seg_start: float,
+    seg_end: float,
+    seg_color: tuple[int, int, int],
+    next_color: tuple[int, int, int] | None,
+) -> None:
+    """
+    Draws one segment of the progress bar. A closed segment (with next_color)
+    blends into the next one over the 10px before its end.
+    """
+    if seg_end <= seg_start:
+        return
+    if seg_start > total_time:
+        return
+
+    draw_start = max(0, seg_start)
+    draw_end = min(seg_end, total_time)
+    if draw_end <= draw_start:
+        return
+
+    proportion_start = draw_start / total_time
+    proportion_end = draw_end / total_time
+    px_start = bar_x + int(proportion_start * bar_width)
+    px_end = bar_x + int(proportion_end * bar_width)
+
+    if next_color is None:
+        pygame.draw.rect(
+            surface, seg_color, (px_start, bar_y, px_end - px_start, bar_height)
+        )
+        return
+
+    boundary_beat = seg_end
+    boundary_prop = boundary_beat / total_time
+    boundary_px = bar_x + int(boundary_prop * bar_width)
+
+    final_end = max(px_start, boundary_px - 10)
+    if final_end > px_start:
+        pygame.draw.rect(
+            surface,
+            seg_color,
+            (px_start, bar_y, final_end - px_start, bar_height),
+        )
+
+    blend_start = max(px_start, boundary_px - 10)
+    blend_end = min(px_end, boundary_px + 10)
+    region_width = blend_end - blend_start
+    if region_width > 0:
+        for step in range(int(region_width)):
+            t = step / region_width
+            r = int(seg_color[0] * (1 - t) + next_color[0] * t)
+            g = int(seg_color[1] * (1 - t) + next_color[1] * t)
+            b = int(seg_color[2] * (1 - t) + next_color[2] * t)
+            pygame.draw.line(
+                surface,
+                (r, g, b),
+                (blend_start + step, bar_y),
+                (blend_start + step, bar_y + bar_height),
+            )
+
+    remaining_start = boundary_px + 10
+    if remaining_start < px_end:
+        pygame.draw.rect(
+            surface,
+            seg_color,
+            (remaining_start, bar_y, px_end - remaining_start, bar_height),
+        )
+
+
 def drawProgressBar(
     screen: pygame.Surface,
     segments: list[dict],
@@ -276,86 +626,30 @@ def drawProgressBar(
     bar_x = barIndent / 2
     borderWidth = 3
 
-    # Outline and background
-    pygame.draw.rect(
-        screen,
-        (0, 0, 0),
-        (
-            bar_x - borderWidth,
-            bar_y - borderWidth,
-            bar_width + borderWidth * 2,
-            bar_height + borderWidth * 2,
-        ),
-        borderWidth * 2,
+    # Outline, background and every closed segment come pre-rendered
+    closed = tuple((seg["start"], seg["end"], seg["color"]) for seg in segments[:-1])
+    live_color = segments[-1]["color"] if segments else None
+    origin = (bar_x - borderWidth, bar_y - borderWidth)
+    screen.blit(
+        _progress_base(screen.get_width(), total_time, closed, live_color), origin
     )
-    pygame.draw.rect(screen, (200, 200, 200), (bar_x, bar_y, bar_width, bar_height))
-
-    # Draw each segment
-    for i, seg in enumerate(segments):
-        seg_start = seg["start"]
-        seg_end = seg["end"]
-        seg_color = seg["color"]
 
-        if seg_end is None:
-            seg_end = current_time
-
-        if seg_end <= seg_start:
-            continue
-        if seg_start > total_time:
-            continue
-
-        draw_start = max(0, seg_start)
-        draw_end = min(seg_end, total_time)
-        if draw_end <= draw_start:
-            continue
-
-        proportion_start = draw_start / total_time
-        proportion_end = draw_end / total_time
-        px_start = bar_x + int(proportion_start * bar_width)
-        px_end = bar_x + int(proportion_end * bar_width)
-
-        if i < len(segments) - 1:
-            boundary_beat = seg_end
-            boundary_prop = boundary_beat / total_time
-            boundary_px = bar_x + int(boundary_prop * bar_width)
-
-            final_end = max(px_start, boundary_px - 10)
-            if final_end > px_start:
-                pygame.draw.rect(
-                    screen,
-                    seg_color,
-                    (px_start, bar_y, final_end - px_start, bar_height),
-                )
-
-            if i + 1 < len(segments):
-                next_color = segments[i + 1]["color"]
-                blend_start = max(px_start, boundary_px - 10)
-                blend_end = min(px_end, boundary_px + 10)
-                region_width = blend_end - blend_start
-                if region_width > 0:
-                    for step in range(int(region_width)):
-                        t = step / region_width
-                        r = int(seg_color[0] * (1 - t) + next_color[0] * t)
-                        g = int(seg_color[1] * (1 - t) + next_color[1] * t)
-                        b = int(seg_color[2] * (1 - t) + next_color[2] * t)
-                        pygame.draw.line(
-                            screen,
-                            (r, g, b),
-                            (blend_start + step, bar_y),
-                            (blend_start + step, bar_y + bar_height),
-                        )
-
-            remaining_start = boundary_px + 10
-            if remaining_start < px_end:
-                pygame.draw.rect(
-                    screen,
-                    seg_color,
-                    (remaining_start, bar_y, px_end - remaining_start, bar_height),
-                )
-        else:
-            pygame.draw.rect(
-                screen, seg_color, (px_start, bar_y, px_end - px_start, bar_height)
-            )
+    # Only the live segment changes from frame to frame
+    if segments:
+        live = segments[-1]
+        seg_end = live["end"] if live["end"] is not None else current_time
+        _draw_segment(
+            screen,
+            bar_x,
+            bar_y,
+            bar_width,
+            bar_height,
+            total_time,
+            live["start"],
+            seg_end,
+            live["color"],
+            None,
+        )
 
     fade_delta = current_time - circle_fade_start
     if fade_delta < 0:
@@ -380,11 +674,17 @@ def drawProgressBar(
 
 def drawScore(screen, score, width, font):
     text_str = f"Score: {score}"
-    text_surf = font.render(text_str, True, (0, 0, 0))
+    text_surf = render_text(font, text_str, (0, 0, 0))
     text_rect = text_surf.get_rect(topright=(width - 15, 10))
     screen.blit(text_surf, text_rect)
 
 
 def drawTopBackground(screen):
-    pygame.draw.rect(screen, (200, 200, 200), (0, 0, WIDTH_SCALE * AMOUNT_OF_NOTES, 60))
-    pygame.draw.line(screen, (0, 0, 0), (0, 60), (WIDTH_SCALE * AMOUNT_OF_NOTES, 60), 3)
+    def render():
+        width = WIDTH_SCALE * AMOUNT_OF_NOTES
+        layer = _new_layer((width, 62))
+        pygame.draw.rect(layer, (200, 200, 200), (0, 0, width, 60))
+        pygame.draw.line(layer, (0, 0, 0), (0, 60), (width, 60), 3)
+        return layer
+
+    screen.blit(_cached_layer(("top",), render), (0, 0))
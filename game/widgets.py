@@ -0,0 +1,258 @@
+from __future__ import annotations
+from typing import Any, Callable, Hashable, Iterable
+import pygame
+
+from .settings import (
+    BORDER_WIDTH,
+    BUTTON_COLOR,
+    BUTTON_HOVER_COLOR,
+    BUTTON_TEXT_COLOR,
+)
+from .fonts import render_text
+
+type Point = tuple[int, int]
+
+_UNDRAWN = object()
+
+
+class Widget:
+    """
+    Something drawn at a fixed place on a RetainedScreen.
+    state() returns everything the widget's appearance depends on, and the
+    widget is only redrawn when that value changes. action, if any, is what
+    the screen's click handler returns when the widget is clicked.
+    """
+
+    def __init__(self, rect: pygame.Rect | tuple, action: str | None = None) -> None:
+        self.rect = pygame.Rect(rect)
+        self.action = action
+        self.drawn_state: Any = _UNDRAWN
+        self.drawn_area = self.rect.copy()
+
+    def hovered(self, mouse_pos: Point) -> bool:
+        # Inclusive of the far edges
+        return (
+            self.rect.left <= mouse_pos[0] <= self.rect.right
+            and self.rect.top <= mouse_pos[1] <= self.rect.bottom
+        )
+
+    def state(self, mouse_pos: Point) -> Hashable:
+        return None
+
+    def area(self, state: Hashable) -> pygame.Rect:
+        """
+        The part of the screen the widget covers when drawn in state.
+        """
+        return self.rect
+
+    def draw(self, surface: pygame.Surface, state: Hashable) -> None:
+        raise NotImplementedError
+
+
+class Button(Widget):
+    """
+    Bordered button that changes colour while the mouse is over it.
+    """
+
+    def __init__(
+        self,
+        rect: pygame.Rect | tuple,
+        text: str,
+        font: pygame.font.Font,
+        action: str | None = None,
+        colour: tuple[int, int, int] = BUTTON_COLOR,
+        hover_colour: tuple[int, int, int] = BUTTON_HOVER_COLOR,
+        text_colour: tuple[int, int, int] = BUTTON_TEXT_COLOR,
+    ) -> None:
+        self.face = pygame.Rect(rect)
+        super().__init__(self.face.inflate(BORDER_WIDTH * 2, BORDER_WIDTH * 2), action)
+        self.text = text
+        self.font = font
+        self.colour = colour
+        self.hover_colour = hover_colour
+        self.text_colour = text_colour
+
+    def hovered(self, mouse_pos: Point) -> bool:
+        # Only the face, the border is not part of the button
+        return (
+            self.face.left <= mouse_pos[0] <= self.face.right
+            and self.face.top <= mouse_pos[1] <= self.face.bottom
+        )
+
+    def state(self, mouse_pos: Point) -> bool:
+        return self.hovered(mouse_pos)
+
+    def draw(self, surface: pygame.Surface, hovered: bool) -> None:
+        pygame.draw.rect(surface, (0, 0, 0), self.rect)
+        pygame.draw.rect(
+            surface, self.hover_colour if hovered else self.colour, self.face
+        )
+        text = render_text(self.font, self.text, self.text_colour)
+        surface.blit(text, text.get_rect(center=self.face.center))
+
+
+class Label(Widget):
+    """
+    Text that can change while its screen is shown, centred on a point.
+    Set text and the next draw picks it up. With an outline colour the text
+    is first drawn offset by a pixel in each direction in that colour.
+    """
+
+    def __init__(
+        self,
+        center: Point,
+        text: str,
+        font: pygame.font.Font,
+        colour: tuple[int, int, int],
+        outline: tuple[int, int, int] | None = None,
+    ) -> None:
+        super().__init__((center, (0, 0)))
+        self.center = center
+        self.text = text
+        self.font = font
+        self.colour = colour
+        self.outline = outline
+
+    def state(self, mouse_pos: Point) -> str:
+        return self.text
+
+    def area(self, text: str) -> pygame.Rect:
+        rect = render_text(self.font, text, self.colour).get_rect(center=self.center)
+        return rect.inflate(2, 2) if self.outline else rect
+
+    def draw(self, surface: pygame.Surface, text: str) -> None:
+        x, y = self.center
+        if self.outline:
+            outline = render_text(self.font, text, self.outline)
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                surface.blit(outline, outline.get_rect(center=(x + dx, y + dy)))
+        main = render_text(self.font, text, self.colour)
+        surface.blit(main, main.get_rect(center=(x, y)))
+
+
+class Control(Widget):
+    """
+    Widget drawn by a function of its own state, for one-off controls whose
+    appearance comes from settings rather than the mouse alone.
+    area, when given, maps the state to the covered rect (e.g. an open dropdown).
+    """
+
+    def __init__(
+        self,
+        rect: pygame.Rect | tuple,
+        state: Callable[[Point], Hashable],
+        draw: Callable[[pygame.Surface, Any], None],
+        area: Callable[[Any], pygame.Rect] | None = None,
+        action: str | None = None,
+    ) -> None:
+        super().__init__(rect, action)
+        self._state = state
+        self._draw = draw
+        self._area = area
+
+    def state(self, mouse_pos: Point) -> Hashable:
+        return self._state(mouse_pos)
+
+    def area(self, state: Hashable) -> pygame.Rect:
+        return self._area(state) if self._area else self.rect
+
+    def draw(self, surface: pygame.Surface, state: Hashable) -> None:
+        self._draw(surface, state)
+
+
+class RetainedScreen:
+    """
+    A menu or overlay kept on screen between frames.
+    Everything that only changes when the screen is entered is painted once
+    into a background surface, and each frame only widgets whose state changed
+    are restored from it and redrawn. draw returns the rects that changed so
+    the caller can pass them to pygame.display.update.
+    """
+
+    def __init__(
+        self,
+        paint: Callable[[pygame.Surface, Any], None],
+        widgets: Iterable[Widget] = (),
+    ) -> None:
+        self.paint = paint
+        self.widgets = list(widgets)
+        self.background: pygame.Surface | None = None
+        self.backdrop: Any = None
+        self.valid = False
+
+    def invalidate(self) -> None:
+        """
+        Repaint the whole screen on the next draw, e.g. after another screen
+        has been shown.
+        """
+        self.valid = False
+
+    def action_at(self, mouse_pos: Point) -> str | None:
+        """
+        action of the widget under mouse_pos, None if it has none. Later
+        widgets are drawn over earlier ones, so they are looked at first.
+        """
+        for widget in reversed(self.widgets):
+            if widget.action is not None and widget.hovered(mouse_pos):
+                return widget.action
+        return None
+
+    def draw(self, screen: pygame.Surface, backdrop: Any = None) -> list[pygame.Rect]:
+        """
+        Bring screen up to date. backdrop is passed to paint, and the
+        background is only repainted when it changes.
+        """
+        if (
+            self.background is None
+            or self.background.get_size() != screen.get_size()
+            or backdrop != self.backdrop
+        ):
+            self.background = pygame.Surface(screen.get_size(), 0, screen)
+            self.paint(self.background, backdrop)
+            self.backdrop = backdrop
+            self.valid = False
+
+        mouse_pos = pygame.mouse.get_pos()
+        if not self.valid:
+            screen.blit(self.background, (0, 0))
+            for widget in self.widgets:
+                self._draw_widget(screen, widget, widget.state(mouse_pos))
+            self.valid = True
+            return [screen.get_rect()]
+
+        changed = {}
+        dirty: list[pygame.Rect] = []
+        for widget in self.widgets:
+            state = widget.state(mouse_pos)
+            if state != widget.drawn_state:
+                changed[widget] = state
+                dirty.append(widget.drawn_area.union(widget.area(state)))
+        if not dirty:
+            return []
+
+        # Restoring the background under a widget also wipes any widget it
+        # overlaps, so those are redrawn too (and may widen the area further)
+        redraw = set(changed)
+        grown = True
+        while grown:
+            grown = False
+            for widget in self.widgets:
+                if widget not in redraw and widget.drawn_area.collidelist(dirty) != -1:
+                    redraw.add(widget)
+                    dirty.append(widget.drawn_area)
+                    grown = True
+
+        for rect in dirty:
+            screen.blit(self.background, rect, rect)
+        for widget in self.widgets:
+            if widget in redraw:
+                self._draw_widget(
+                    screen, widget, changed.get(widget, widget.drawn_state)
+                )
+        return dirty
+
+    @staticmethod
+    def _draw_widget(screen: pygame.Surface, widget: Widget, state: Hashable) -> None:
+        widget.draw(screen, state)
+        widget.drawn_state = state
+        widget.drawn_area = widget.area(state).copy()
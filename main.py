@@ -1,6 +1,7 @@
 # main.py
 import argparse
 import logging
+from pathlib import Path
 from game.game import Game
 
 def main() -> None:
@@ -11,6 +12,17 @@ def main() -> None:
         choices=["DEBUG", "INFO"],
         help="Set the logging level"
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Show frame timings in an overlay"
+    )
+    parser.add_argument(
+        "--profile-dump",
+        type=Path,
+        metavar="FILE",
+        help="Keep writing the latest frame timings to FILE (.csv or .json), implies --profile"
+    )
     args = parser.parse_args()
 
     logging.basicConfig(
@@ -18,7 +30,10 @@ def main() -> None:
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
     )
 
-    game = Game()
+    game = Game(
+        profile=args.profile or args.profile_dump is not None,
+        profile_dump=args.profile_dump,
+    )
     game.run()
 
 if __name__ == '__main__':